@@ -1,4 +1,14 @@
+import os
+import re
+import bz2
+import json
+import gzip
+import mmap
+import pickle
+
+from html import unescape
 from random import uniform
+from contextlib import nullcontext
 from wrapt import ObjectProxy
 
 from .drawing import *
@@ -6,46 +16,13 @@ from .exploring import *
 from .moving import *
 from .analyzing import *
 from .simulating import *
+from .coloring import parse_color
 
 
-def _parse(value):
-    if isinstance(value, str):
-        line = value.strip()
-        if line.startswith('rgb(') or line.startswith('rgba('):
-            if not line.endswith(')'):
-                raise ValueError('rgb and rgba must end with \')\'')
-            length = line.find('(')
-            phrase = line[(length + 1):-1]
-            if phrase.find('(') != -1 or phrase.find(')') != -1:
-                raise ValueError('rgb and rgba must have only one \'(\' and only one \')\'')
-
-            words = phrase.split(',')
-            if len(words) != length:
-                if length == 3:
-                    raise ValueError('rgb must have three components')
-                else:
-                    raise ValueError('rgba must have four components')
-
-            r = int(words[0])
-            g = int(words[1])
-            b = int(words[2])
-            if r < 0 or r > 255 or g < 0 or g > 255 or b < 0 or b > 255:
-                raise ValueError('rgb channels must be between 0 and 255')
-            if length == 4:
-                a = float(words[3])
-                if a < 0 or a > 1:
-                    raise ValueError('rgba alpha must be between 0 and 1')
-                return (r, g, b, a)
-            else:
-                return (r, g, b)
-
-    return value
-
-
-def _burst(graphs, nodes, weight='weight'):
+def _burst(graphs, nodes, weight='weight', workers=None):
     graphs = [g.copy() for g in graphs]
 
-    analyze_last_to_move_all(graphs, nodes, weight)
+    analyze_last_to_move_all(graphs, nodes, weight, workers)
 
     for g in graphs:
         skin_seaborn(g, nodes)
@@ -53,7 +30,26 @@ def _burst(graphs, nodes, weight='weight'):
     return graphs
 
 
-def load(path):
+def _pull(frame, data, keys):
+    # networkx keeps one dict per element, so the values are copied one by one in a single pass
+    columns = [[] for key in keys]
+    for d in data:
+        for key, column in zip(keys, columns):
+            column.append(d.get(key))
+    for key, column in zip(keys, columns):
+        frame[key] = column
+
+
+def _push(frame, data, keys):
+    columns = [frame[key].tolist() for key in keys]
+    masks = [frame[key].notna().to_numpy() for key in keys]
+    for i, d in enumerate(data):
+        for key, column, mask in zip(keys, columns, masks):
+            if mask[i]:
+                d[key] = column[i]
+
+
+def _read_gml(path):
     g = nx.read_gml(path, 'id')
 
     keys = list(g.graph)
@@ -73,7 +69,7 @@ def load(path):
 
     for n in g.nodes:
         for key in g.nodes[n]:
-            g.nodes[n][key] = _parse(g.nodes[n][key])
+            g.nodes[n][key] = parse_color(g.nodes[n][key])
 
         if 'pos' in g.nodes[n]:
             warn('node pos is not allowed in file, ignoring')
@@ -91,7 +87,7 @@ def load(path):
 
     for n, m in g.edges:
         for key in g.edges[n, m]:
-            g.edges[n, m][key] = _parse(g.edges[n, m][key])
+            g.edges[n, m][key] = parse_color(g.edges[n, m][key])
 
         if 'labflip' in g.edges[n, m]:
             value = g.edges[n, m]['labflip']
@@ -99,7 +95,606 @@ def load(path):
                 raise ValueError('edge labflip must be binary')
             g.edges[n, m]['labflip'] = bool(value)
 
-    return Graph(g)
+    return g
+
+
+
+GML_KEY = r'[A-Za-z][0-9A-Za-z_]*\b'
+
+# same tokens as networkx, except that a key and its value are matched together
+GML_TOKENS = re.compile(r'({})\s*(?:({})|({})|({})|({})|({}))|({})|({})|(.)'.format(
+    GML_KEY,
+    r'[+-]?(?:[0-9]*\.[0-9]+|[0-9]+\.[0-9]*|INF)(?:[Ee][+-]?[0-9]+)?',
+    r'[+-]?[0-9]+',
+    r'".*?"',
+    r'\[',
+    GML_KEY,
+    r'\]',
+    r'#.*|\s+',
+))
+
+GML_REAL, GML_INT, GML_STRING, GML_START, GML_WORD, GML_END, GML_SPACE, GML_OTHER = range(2, 10)
+
+GML_LIST = '_networkx_list_start'
+
+GML_CHUNK = 2**20
+
+
+class _Unstreamable(Exception):
+    pass
+
+
+class _Frame:
+    def __init__(self, key):
+        self.key = key
+        self.data = {}
+        self.repeated = None
+
+    def set(self, key, value):
+        data = self.data
+        if key not in data:
+            data[key] = value
+        elif self.repeated is None or key not in self.repeated:
+            # repeated keys are lists, like networkx does
+            if self.repeated is None:
+                self.repeated = set()
+            self.repeated.add(key)
+            data[key] = [data[key], value]
+        else:
+            data[key].append(value)
+
+    def close(self):
+        if self.repeated is not None:
+            for key in self.repeated:
+                values = self.data[key]
+                if values[0] == GML_LIST:
+                    self.data[key] = values[1:]
+        return self.data
+
+
+def _parse_all(data):
+    # only strings can be colors, so numbers are not even inspected
+    for key, value in data.items():
+        if isinstance(value, str) and 'rgb' in value:
+            data[key] = parse_color(value)
+
+
+def _open_gml(path):
+    if isinstance(path, str):
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rb')
+        if path.endswith('.bz2'):
+            return bz2.open(path, 'rb')
+        return open(path, 'rb')
+    return nullcontext(path)
+
+
+def _chunks_gml(file):
+    # whole lines are read, because no token spans lines
+    while True:
+        lines = file.readlines(GML_CHUNK)
+        if not lines:
+            break
+        try:
+            yield b''.join(lines).decode('ascii')
+        except UnicodeDecodeError:
+            raise _Unstreamable()
+
+
+class _GMLStream:
+    def __init__(self):
+        self.g = None
+        self.attrs = _Frame('graph')
+        self.node_defaults = []
+        self.edge_defaults = []
+        self.pending = []
+        self.done = False
+
+    def _build(self):
+        attrs = self.attrs.close()
+        directed = attrs.pop('directed', False)
+        multigraph = attrs.pop('multigraph', False)
+        if multigraph:
+            raise _Unstreamable()
+        self.g = nx.DiGraph() if directed else nx.Graph()
+
+        for key in list(attrs):
+            if key.startswith('node_'):
+                self.node_defaults.append((key[5:], parse_color(attrs.pop(key))))
+            elif key.startswith('edge_'):
+                self.edge_defaults.append((key[5:], parse_color(attrs.pop(key))))
+
+    def set_attr(self, key, value):
+        # the graph type and the defaults must be known before the first node or edge
+        if self.g is not None:
+            if key in ('directed', 'multigraph') or key.startswith('node_') or key.startswith('edge_'):
+                raise _Unstreamable()
+        self.attrs.set(key, value)
+
+    def add_node(self, data):
+        if self.g is None:
+            self._build()
+
+        if 'id' not in data:
+            raise _Unstreamable()
+        n = data.pop('id')
+        if n in self.g:
+            raise _Unstreamable()
+
+        _parse_all(data)
+        for suffix, value in self.node_defaults:
+            if suffix not in data:
+                data[suffix] = value
+
+        if 'pos' in data:
+            warn('node pos is not allowed in file, ignoring')
+        data['pos'] = (data.pop('x', None), data.pop('y', None))
+
+        self.g.add_node(n, **data)
+
+    def add_edge(self, data):
+        if self.g is None:
+            self._build()
+
+        if 'source' not in data or 'target' not in data:
+            raise _Unstreamable()
+        n = data.pop('source')
+        m = data.pop('target')
+
+        # networkx adds all nodes before the edges, so the order is kept by deferring the remaining edges
+        if self.pending or n not in self.g or m not in self.g:
+            self.pending.append((n, m, data))
+        else:
+            self._add_edge(n, m, data)
+
+    def _add_edge(self, n, m, data):
+        if n not in self.g or m not in self.g or self.g.has_edge(n, m):
+            raise _Unstreamable()
+
+        _parse_all(data)
+        for suffix, value in self.edge_defaults:
+            if suffix not in data:
+                data[suffix] = value
+
+        if 'labflip' in data:
+            value = data['labflip']
+            if value != 0 and value != 1:
+                raise ValueError('edge labflip must be binary')
+            data['labflip'] = bool(value)
+
+        self.g.add_edge(n, m, **data)
+
+    def finish(self):
+        if self.g is None:
+            self._build()
+
+        for n, m, data in self.pending:
+            self._add_edge(n, m, data)
+
+        self.g.graph.update(self.attrs.close())
+
+        return self.g
+
+
+def _stream_gml(path):
+    stream = _GMLStream()
+
+    # only the lists inside the graph are kept, like networkx does
+    frames = []
+    with _open_gml(path) as file:
+        for text in _chunks_gml(file):
+            for match in GML_TOKENS.finditer(text):
+                category = match.lastindex
+                if category == GML_SPACE:
+                    continue
+
+                if category == GML_END:
+                    if not frames:
+                        raise _Unstreamable()
+                    frame = frames.pop()
+                    depth = len(frames)
+                    if depth == 0:
+                        if frame.key == 'graph':
+                            stream.done = True
+                    elif depth == 1 and frames[0].key == 'graph':
+                        if frame.key == 'node':
+                            stream.add_node(frame.close())
+                        elif frame.key == 'edge':
+                            stream.add_edge(frame.close())
+                        else:
+                            stream.set_attr(frame.key, frame.close())
+                    else:
+                        frames[-1].set(frame.key, frame.close())
+                    continue
+
+                if category == GML_OTHER:
+                    raise _Unstreamable()
+
+                key, token = match.group(1, category)
+
+                if category == GML_START:
+                    if not frames and key == 'graph' and stream.done:
+                        raise _Unstreamable()
+                    frames.append(_Frame(key))
+                    continue
+
+                if category == GML_INT:
+                    value = int(token)
+                elif category == GML_STRING:
+                    value = unescape(token[1:-1])
+                    if value == '()':
+                        value = ()
+                    elif value == '[]':
+                        value = []
+                elif category == GML_REAL:
+                    value = float(token)
+                elif key in ('id', 'label', 'source', 'target'):
+                    value = unescape(token)
+                elif token in ('NAN', 'INF'):
+                    value = float(token)
+                else:
+                    raise _Unstreamable()
+
+                depth = len(frames)
+                if depth == 0:
+                    if key == 'graph':
+                        raise _Unstreamable()
+                elif depth == 1 and frames[0].key == 'graph':
+                    if key in ('node', 'edge'):
+                        raise _Unstreamable()
+                    stream.set_attr(key, value)
+                else:
+                    frames[-1].set(key, value)
+
+    if frames or not stream.done:
+        raise _Unstreamable()
+
+    return stream.finish()
+
+
+def _wrap(g, positions=True):
+    # a loaded graph is not shared, so it is wrapped without the copy of the constructor
+    graph = Graph.__new__(Graph)
+    ObjectProxy.__init__(graph, g)
+    graph._version = 0
+    if positions:
+        init(graph)
+    return graph
+
+
+def load(path):
+    try:
+        g = _stream_gml(path)
+    except _Unstreamable:
+        # unusual files, such as multigraphs or invalid ones, are left to networkx
+        g = _read_gml(path)
+
+    return _wrap(g)
+
+
+SNAPSHOT_MAGIC = b'FMSNAP01'
+SNAPSHOT_ALIGN = 64
+
+# integers beyond this bound are not exact in a float column
+SNAPSHOT_EXACT = 2**53
+
+
+class _SnapshotWriter:
+    def __init__(self):
+        self.blocks = []
+        self.size = 0
+
+    def add(self, data):
+        # blocks are aligned, so each array can be viewed directly from the map
+        padding = -self.size % SNAPSHOT_ALIGN
+        if padding:
+            self.blocks.append(bytes(padding))
+            self.size += padding
+        offset = self.size
+        self.blocks.append(data)
+        self.size += len(data)
+        return offset
+
+    def array(self, values, dtype=None):
+        array = np.ascontiguousarray(values, dtype)
+        return {
+            'kind': 'array',
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': self.add(array.reshape(-1).view('u1')),
+        }
+
+    def object(self, value):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return {
+            'kind': 'object',
+            'size': len(data),
+            'offset': self.add(data),
+        }
+
+    def column(self, values):
+        types = set(map(type, values))
+
+        if types == {bool}:
+            return self.array(values, '?')
+
+        if types == {int}:
+            try:
+                return self.array(values, '<i8')
+            except OverflowError:
+                return self.object(values)
+
+        if types == {float}:
+            return self.array(values, '<f8')
+
+        if types == {int, float}:
+            # a mixed column is stored as floats with a flag for each integer
+            flags = [type(value) is int for value in values]
+            if all(abs(value) <= SNAPSHOT_EXACT for value, flag in zip(values, flags) if flag):
+                return {
+                    'kind': 'number',
+                    'values': self.array(values, '<f8'),
+                    'flags': self.array(flags, '?'),
+                }
+            return self.object(values)
+
+        if types == {str}:
+            data = [value.encode('utf-8', 'surrogatepass') for value in values]
+            offsets = np.zeros(len(data) + 1, '<i8')
+            np.cumsum([len(value) for value in data], out=offsets[1:])
+            return {
+                'kind': 'string',
+                'offsets': self.array(offsets),
+                'data': self.array(np.frombuffer(b''.join(data), 'u1')),
+            }
+
+        if types == {tuple}:
+            # positions, colors and other tuples are stored as one column per item
+            lengths = set(map(len, values))
+            if len(lengths) == 1:
+                length = lengths.pop()
+                if length:
+                    return {
+                        'kind': 'tuple',
+                        'items': [self.column([value[i] for value in values]) for i in range(length)],
+                    }
+
+        return self.object(values)
+
+    def attributes(self, data, size):
+        rows = {}
+        columns = {}
+        for i, d in enumerate(data):
+            for key, value in d.items():
+                if key not in columns:
+                    rows[key] = []
+                    columns[key] = []
+                rows[key].append(i)
+                columns[key].append(value)
+
+        specs = []
+        for key, column in columns.items():
+            spec = {'values': self.column(column)}
+            if len(column) < size:
+                mask = np.zeros(size, '?')
+                mask[rows[key]] = True
+                spec['mask'] = self.array(mask)
+            specs.append(spec)
+
+        return {
+            'keys': self.column(list(columns)),
+            'columns': specs,
+        }
+
+    def frame(self, frame):
+        specs = []
+        for key in frame.columns:
+            series = frame[key]
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+                specs.append(self.array(series.to_numpy()))
+            elif series.dtype == object:
+                specs.append(self.column(series.tolist()))
+            else:
+                # extension dtypes, such as categories, are kept as they are
+                specs.append(self.object(series))
+
+        return {
+            'keys': self.column(list(frame.columns)),
+            'columns': specs,
+        }
+
+
+class _SnapshotReader:
+    def __init__(self, buffer, start):
+        self.buffer = buffer
+        self.start = start
+
+    def array(self, spec):
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        count = 1
+        for length in shape:
+            count *= length
+        if count == 0:
+            return np.empty(shape, dtype)
+        # the array is a view of the map, so its pages are only read when accessed
+        return np.frombuffer(self.buffer, dtype, count, self.start + spec['offset']).reshape(shape)
+
+    def object(self, spec):
+        offset = self.start + spec['offset']
+        return pickle.loads(self.buffer[offset:(offset + spec['size'])])
+
+    def column(self, spec):
+        kind = spec['kind']
+
+        if kind == 'array':
+            return self.array(spec).tolist()
+
+        if kind == 'number':
+            values = self.array(spec['values']).tolist()
+            flags = self.array(spec['flags']).tolist()
+            return [int(value) if flag else value for value, flag in zip(values, flags)]
+
+        if kind == 'string':
+            offsets = self.array(spec['offsets']).tolist()
+            data = self.array(spec['data']).tobytes()
+            return [data[offsets[i]:offsets[i + 1]].decode('utf-8', 'surrogatepass') for i in range(len(offsets) - 1)]
+
+        if kind == 'tuple':
+            return list(zip(*(self.column(item) for item in spec['items'])))
+
+        return self.object(spec)
+
+    def attributes(self, spec, data):
+        keys = self.column(spec['keys'])
+        for key, column in zip(keys, spec['columns']):
+            values = self.column(column['values'])
+            if 'mask' in column:
+                rows = np.flatnonzero(self.array(column['mask'])).tolist()
+            else:
+                rows = range(len(values))
+            for i, value in zip(rows, values):
+                data[i][key] = value
+
+    def frame(self, spec, index):
+        # tuples become a multi-index, as in the reindex of the frame properties
+        index = pd.Index(index)
+        keys = self.column(spec['keys'])
+        columns = {}
+        for key, column in zip(keys, spec['columns']):
+            if column['kind'] == 'array':
+                columns[key] = self.array(column)
+            else:
+                columns[key] = self.column(column)
+        if not columns:
+            return pd.DataFrame(index=index)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+
+def save_snapshot(g, path):
+    '''Save a graph to a binary snapshot, which loads much faster than GML.
+
+    Numeric attributes and frame columns are stored as raw arrays. Any other
+    value is stored with :mod:`pickle`, so see the warning in :func:`load_snapshot
+    <freeman.load_snapshot>`.
+
+    :type g: NetworkX Graph or DiGraph
+    :param g: The graph.
+
+    :type path: str
+    :param path: The path of the snapshot file.
+    '''
+    if not isinstance(path, str):
+        raise TypeError('snapshot path must be a string')
+
+    nodes = list(g.nodes)
+    indices = {n: i for i, n in enumerate(nodes)}
+    if g.is_multigraph():
+        edges = list(g.edges(keys=True, data=True))
+    else:
+        edges = list(g.edges(data=True))
+
+    writer = _SnapshotWriter()
+
+    dtype = '<i4' if len(nodes) < 2**31 else '<i8'
+    header = {
+        'directed': g.is_directed(),
+        'multigraph': g.is_multigraph(),
+        'graph': writer.attributes([g.graph], 1),
+        'nodes': writer.column(nodes),
+        'nodedata': writer.attributes(g.nodes.values(), len(nodes)),
+        'sources': writer.array([indices[edge[0]] for edge in edges], dtype),
+        'targets': writer.array([indices[edge[1]] for edge in edges], dtype),
+        'edgedata': writer.attributes((edge[-1] for edge in edges), len(edges)),
+    }
+    if g.is_multigraph():
+        header['keys'] = writer.column([edge[2] for edge in edges])
+    if isinstance(g, Graph):
+        header['wrapped'] = True
+        # frames without columns are not reindexed, since they are recreated on access
+        if hasattr(g, '_nodeframe') and not g._nodeframe.columns.empty:
+            header['nodeframe'] = writer.frame(g.nodeframe)
+        if hasattr(g, '_edgeframe') and not g._edgeframe.columns.empty:
+            header['edgeframe'] = writer.frame(g.edgeframe)
+
+    data = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    size = len(SNAPSHOT_MAGIC) + 8 + len(data)
+    padding = -size % SNAPSHOT_ALIGN
+
+    # the file is replaced atomically, so a concurrent load never reads it partially
+    temp = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp, 'wb') as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(len(data).to_bytes(8, 'little'))
+        file.write(data)
+        file.write(bytes(padding))
+        for block in writer.blocks:
+            file.write(block)
+    os.replace(temp, path)
+
+
+def load_snapshot(path):
+    '''Load a graph from a binary snapshot saved by :func:`save_snapshot
+    <freeman.save_snapshot>`.
+
+    .. warning::
+       Attributes and frame columns of object type are restored with
+       :mod:`pickle`, which can execute arbitrary code. Only load snapshot files
+       that you saved yourself or otherwise trust.
+
+    :type path: str
+    :param path: The path of the snapshot file.
+
+    :rtype: freeman.Graph
+    :return: The graph, with the nodeframe and edgeframe it had when saved.
+    '''
+    if not isinstance(path, str):
+        raise TypeError('snapshot path must be a string')
+
+    with open(path, 'rb') as file:
+        if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError('snapshot file must be saved by freeman')
+        length = int.from_bytes(file.read(8), 'little')
+        header = json.loads(file.read(length).decode('utf-8'))
+        size = len(SNAPSHOT_MAGIC) + 8 + length
+        # the map is copy-on-write, so edits only copy the pages they touch and never reach the file
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    reader = _SnapshotReader(buffer, size + (-size % SNAPSHOT_ALIGN))
+
+    if header['multigraph']:
+        g = nx.MultiDiGraph() if header['directed'] else nx.MultiGraph()
+    else:
+        g = nx.DiGraph() if header['directed'] else nx.Graph()
+
+    reader.attributes(header['graph'], [g.graph])
+
+    nodes = reader.column(header['nodes'])
+    nodedata = [{} for _ in nodes]
+    reader.attributes(header['nodedata'], nodedata)
+    g.add_nodes_from(zip(nodes, nodedata))
+
+    sources = [nodes[i] for i in reader.array(header['sources']).tolist()]
+    targets = [nodes[i] for i in reader.array(header['targets']).tolist()]
+    edgedata = [{} for _ in sources]
+    reader.attributes(header['edgedata'], edgedata)
+    if header['multigraph']:
+        g.add_edges_from(zip(sources, targets, reader.column(header['keys']), edgedata))
+    else:
+        g.add_edges_from(zip(sources, targets, edgedata))
+
+    # the positions of a wrapped graph were already initialized before saving
+    graph = _wrap(g, 'wrapped' not in header)
+
+    # numeric frame columns remain views of the map until they are modified
+    if 'nodeframe' in header:
+        graph._nodeframe = reader.frame(header['nodeframe'], list(graph.nodes))
+        graph._nodestamp = graph._version
+    if 'edgeframe' in header:
+        graph._edgeframe = reader.frame(header['edgeframe'], list(graph.edges))
+        graph._edgestamp = graph._version
+
+    return graph
 
 
 def init(g):
@@ -329,8 +924,8 @@ def concat_edges(graphs, key):
     return concat(dataframes, key)
 
 
-def affiliation_animation(graphs, nodes, weight='weight', width=None, height=None):
-    graphs = _burst(graphs, nodes, weight)
+def affiliation_animation(graphs, nodes, weight='weight', width=None, height=None, workers=None):
+    graphs = _burst(graphs, nodes, weight, workers)
     a = Animation(width, height)
     for g in graphs:
         g.set_all_nodes('labpos', 'hover')
@@ -339,8 +934,8 @@ def affiliation_animation(graphs, nodes, weight='weight', width=None, height=Non
     return a
 
 
-def affiliation_tracking(graphs, nodes, weight='weight', subjects=[]):
-    graphs = _burst(graphs, nodes, weight)
+def affiliation_tracking(graphs, nodes, weight='weight', subjects=[], workers=None):
+    graphs = _burst(graphs, nodes, weight, workers)
     g = stack_and_track(graphs, subjects)
     g.graph['awidth'] = 1
     g.graph['acolor'] = (135, 135, 138)
@@ -351,9 +946,15 @@ class Graph(ObjectProxy):
     def interact(self, physics=False, path=None):
         '''Object-oriented wrapper for :func:`interact <freeman.drawing.interact>`.'''
         interact(self, physics, path)
-    def draw(self, toolbar=False):
+    def draw(self, toolbar=False, backend=None, compact=False):
         '''Object-oriented wrapper for :func:`draw <freeman.drawing.draw>`.'''
-        draw(self, toolbar)
+        draw(self, toolbar, backend, compact)
+    def render_html(self, path, toolbar=False, backend=None, compact=False, cache=True):
+        '''Object-oriented wrapper for :func:`render_html <freeman.drawing.render_html>`.'''
+        render_html(self, path, toolbar, backend, compact, cache)
+    def render_json(self, path, backend=None, compact=False, cache=True):
+        '''Object-oriented wrapper for :func:`render_json <freeman.drawing.render_json>`.'''
+        render_json(self, path, backend, compact, cache)
 
     def extract_nodes(self, map):
         return extract_nodes(self, map)
@@ -407,22 +1008,22 @@ class Graph(ObjectProxy):
         return distest(self.nodeframe, x)
     def distest_edges(self, x):
         return distest(self.edgeframe, x)
-    def cortest_nodes(self, x, y, max_perm=None):
-        return cortest(self.nodeframe, x, y, max_perm)
-    def cortest_edges(self, x, y, max_perm=None):
-        return cortest(self.edgeframe, x, y, max_perm)
-    def chitest_nodes(self, x, y, max_perm=None):
-        return chitest(self.nodeframe, x, y, max_perm)
-    def chitest_edges(self, x, y, max_perm=None):
-        return chitest(self.edgeframe, x, y, max_perm)
-    def reltest_nodes(self, a, b, max_perm=None):
-        return reltest(self.nodeframe, a, b, max_perm)
-    def reltest_edges(self, a, b, max_perm=None):
-        return reltest(self.edgeframe, a, b, max_perm)
-    def mixtest_nodes(self, x, y, max_perm=None):
-        return mixtest(self.nodeframe, x, y, max_perm)
-    def mixtest_edges(self, x, y, max_perm=None):
-        return mixtest(self.edgeframe, x, y, max_perm)
+    def cortest_nodes(self, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return cortest(self.nodeframe, x, y, max_perm, seed, chunk, workers, alpha, tolerance)
+    def cortest_edges(self, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return cortest(self.edgeframe, x, y, max_perm, seed, chunk, workers, alpha, tolerance)
+    def chitest_nodes(self, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return chitest(self.nodeframe, x, y, max_perm, seed, chunk, workers, alpha, tolerance)
+    def chitest_edges(self, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return chitest(self.edgeframe, x, y, max_perm, seed, chunk, workers, alpha, tolerance)
+    def reltest_nodes(self, a, b, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return reltest(self.nodeframe, a, b, max_perm, seed, chunk, workers, alpha, tolerance)
+    def reltest_edges(self, a, b, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return reltest(self.edgeframe, a, b, max_perm, seed, chunk, workers, alpha, tolerance)
+    def mixtest_nodes(self, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return mixtest(self.nodeframe, x, y, max_perm, seed, chunk, workers, alpha, tolerance)
+    def mixtest_edges(self, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+        return mixtest(self.edgeframe, x, y, max_perm, seed, chunk, workers, alpha, tolerance)
     def linregress_nodes(self, X, y, *args, **kwargs):
         return linregress(self.nodeframe, X, y, *args, **kwargs)
     def linregress_edges(self, X, y, *args, **kwargs):
@@ -479,11 +1080,12 @@ class Graph(ObjectProxy):
         boxplot(self.nodeframe, x, y, control)
     def boxplot_edges(self, x, y, control=None):
         boxplot(self.edgeframe, x, y, control)
-    def girvan_newman(self):
-        girvan_newman(self)
+    def girvan_newman(self, levels=None, most_valuable_edge=None):
+        girvan_newman(self, levels, most_valuable_edge)
 
     def __init__(self, g):
         super().__init__(g.copy())
+        self._version = 0
         init(self)
     def dyads(self, ordered=False):
         return dyads(self, ordered)
@@ -529,6 +1131,8 @@ class Graph(ObjectProxy):
         skin_seaborn(self, other)
     def skin_pyvis(self):
         skin_pyvis(self)
+    def save(self, path):
+        save_snapshot(self, path)
 
     def copy(self):
         return Graph(self.__wrapped__.copy())
@@ -543,16 +1147,73 @@ class Graph(ObjectProxy):
     def reverse(self):
         return Graph(self.__wrapped__.reverse())
 
+    def add_node(self, *args, **kwargs):
+        self.__wrapped__.add_node(*args, **kwargs)
+        self._version += 1
+    def add_nodes_from(self, *args, **kwargs):
+        self.__wrapped__.add_nodes_from(*args, **kwargs)
+        self._version += 1
+    def remove_node(self, *args, **kwargs):
+        self.__wrapped__.remove_node(*args, **kwargs)
+        self._version += 1
+    def remove_nodes_from(self, *args, **kwargs):
+        self.__wrapped__.remove_nodes_from(*args, **kwargs)
+        self._version += 1
+    def add_edge(self, *args, **kwargs):
+        self.__wrapped__.add_edge(*args, **kwargs)
+        self._version += 1
+    def add_edges_from(self, *args, **kwargs):
+        self.__wrapped__.add_edges_from(*args, **kwargs)
+        self._version += 1
+    def add_weighted_edges_from(self, *args, **kwargs):
+        self.__wrapped__.add_weighted_edges_from(*args, **kwargs)
+        self._version += 1
+    def remove_edge(self, *args, **kwargs):
+        self.__wrapped__.remove_edge(*args, **kwargs)
+        self._version += 1
+    def remove_edges_from(self, *args, **kwargs):
+        self.__wrapped__.remove_edges_from(*args, **kwargs)
+        self._version += 1
+    def update(self, *args, **kwargs):
+        self.__wrapped__.update(*args, **kwargs)
+        self._version += 1
+    def clear(self):
+        self.__wrapped__.clear()
+        self._version += 1
+    def clear_edges(self):
+        self.__wrapped__.clear_edges()
+        self._version += 1
+
+    # the frames are only reindexed when the version changes, so edits made
+    # through __wrapped__ or by networkx functions must be followed by this call
+    def invalidate(self):
+        self._version += 1
+
+    def pull_nodedata(self, *keys):
+        _pull(self.nodeframe, self.nodes.values(), keys)
+    def pull_edgedata(self, *keys):
+        _pull(self.edgeframe, (d for _, _, d in self.edges(data=True)), keys)
+    def push_nodedata(self, *keys):
+        _push(self.nodeframe, self.nodes.values(), keys)
+    def push_edgedata(self, *keys):
+        _push(self.edgeframe, (d for _, _, d in self.edges(data=True)), keys)
+
     @property
     def nodeframe(self):
         if not hasattr(self, '_nodeframe'):
             self._nodeframe = pd.DataFrame()
-        self._nodeframe = self._nodeframe.reindex(self.nodes, copy=False)
+            self._nodestamp = None
+        if self._nodestamp != self._version:
+            self._nodeframe = self._nodeframe.reindex(self.nodes, copy=False)
+            self._nodestamp = self._version
         return self._nodeframe
 
     @property
     def edgeframe(self):
         if not hasattr(self, '_edgeframe'):
             self._edgeframe = pd.DataFrame()
-        self._edgeframe = self._edgeframe.reindex(self.edges, copy=False)
+            self._edgestamp = None
+        if self._edgestamp != self._version:
+            self._edgeframe = self._edgeframe.reindex(self.edges, copy=False)
+            self._edgestamp = self._version
         return self._edgeframe
@@ -1,47 +1,353 @@
 import sys
 
+import numpy as np
 import pandas as pd
 import networkx as nx
 
-try:
-    import seaborn as sns
-except NotImplementedError:
-    sns = None
-
-from math import isclose, sqrt, log
+from math import isclose, sqrt, log, factorial
+from warnings import warn
 from statistics import variance
-from random import choices, sample
-from itertools import product, permutations, combinations
-from scipy.stats import shapiro, normaltest, kstest, norm, powerlaw, expon, pearsonr, chi2_contingency, ttest_1samp, ttest_ind, ttest_rel
-from scipy.cluster.hierarchy import dendrogram
-from statsmodels.api import OLS, Logit
-
-try:
-    from prince import CA
-
-    from matplotlib import pyplot as plt
-except NotImplementedError:
-    pass
+from random import Random
+from itertools import permutations, combinations, islice
 
 from .drawing import get_node_label
 from .exploring import Log
+from .parallel import _imap
 
 
 DPI = 100
 
 DEC = 6
 
+PERM_CHUNK = 2**20
+
+PERM_BLOCK = 1000
+
+WORKERS = 1
+
+AUTO_PERM = 100000
+
+AUTO_BLOCK = 100
+
+AUTO_ALPHA = 0.05
+
+AUTO_TOLERANCE = 0.005
+
+AUTO_Z = 2.576
+
+MAX_EXACT = 2**24
+
+FALLBACK_PERM = 10000
+
+SIGN_BITS = 16
+
+CA_COMPONENTS = 2
+
+CA_DENSE = 2**16
+
+
+_styled = False
+
+
+def _seaborn():
+    global _styled
+
+    # seaborn and matplotlib are slow to import, so they are imported and styled on first plot
+    import seaborn as sns
+
+    if not _styled:
+        sns.set()
+        _styled = True
+
+    return sns
+
+
+def _pyplot():
+    _seaborn()
+
+    from matplotlib import pyplot as plt
+
+    return plt
+
 
 def _varzero(a):
     return isclose(variance(a), 0)
 
 
-def _product(population, k, max_perm):
-    return (choices(population, k=k) for _ in range(max_perm))
+def _workers(workers):
+    if workers is None:
+        workers = WORKERS
+    if not isinstance(workers, int):
+        raise TypeError('workers must be an integer')
+    if workers <= 0:
+        raise ValueError('workers must be positive')
+    return workers
+
+
+def _seedseq(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def _max_perm(max_perm):
+    if isinstance(max_perm, str):
+        if max_perm != 'auto':
+            raise ValueError('max_perm must be an integer or \'auto\'')
+    else:
+        if not isinstance(max_perm, int):
+            raise TypeError('max_perm must be an integer or \'auto\'')
+        if max_perm < 0:
+            raise ValueError('max_perm must be non-negative')
+    return max_perm
+
+
+def _alpha(alpha):
+    if alpha is None:
+        alpha = AUTO_ALPHA
+    if not isinstance(alpha, (int, float)):
+        raise TypeError('alpha must be numeric')
+    if alpha <= 0 or alpha >= 1:
+        raise ValueError('alpha must be between 0 and 1')
+    return alpha
+
 
+def _tolerance(tolerance):
+    if tolerance is None:
+        tolerance = AUTO_TOLERANCE
+    if not isinstance(tolerance, (int, float)):
+        raise TypeError('tolerance must be numeric')
+    if tolerance <= 0:
+        raise ValueError('tolerance must be positive')
+    return tolerance
 
-def _permutations(population, max_perm):
-    return (sample(population, len(population)) for _ in range(max_perm))
+
+def _chunk_size(length, chunk):
+    # only the default is capped, so an explicit chunk is always honored
+    if chunk is None:
+        return max(1, min(PERM_BLOCK, PERM_CHUNK // max(1, length)))
+    if not isinstance(chunk, int):
+        raise TypeError('chunk must be an integer')
+    if chunk <= 0:
+        raise ValueError('chunk must be positive')
+    return max(1, chunk // max(1, length))
+
+
+def _chunks(max_perm, size):
+    sizes = [size] * (max_perm // size)
+    if max_perm % size:
+        sizes.append(max_perm % size)
+    return sizes
+
+
+def _permutations(rng, size, length):
+    return rng.permuted(np.tile(np.arange(length), (size, 1)), axis=1)
+
+
+def _product(rng, size, length):
+    return rng.integers(0, 2, (size, length), dtype=np.int8).astype(bool)
+
+
+def _exact_cost(sampler, length):
+    if sampler is _product:
+        return 2**((length + 1) // 2) + 2**(length // 2)
+    return factorial(length)
+
+
+def _exact_blocks(length, size):
+    resamples = permutations(range(length))
+    while True:
+        block = list(islice(resamples, size))
+        if not block:
+            break
+        yield np.array(block, dtype=np.intp).reshape(len(block), length)
+
+
+def _random_blocks(max_perm, size, seed):
+    sizes = _chunks(max_perm, size)
+    streams = _seedseq(seed).spawn(len(sizes))
+    return zip(sizes, streams)
+
+
+def _above(results, observed, twosided):
+    tolerance = 1e-9 * abs(observed)
+    if not twosided:
+        return int(np.count_nonzero(results >= observed - tolerance))
+    if observed < 0:
+        return int(np.count_nonzero(results <= observed + tolerance))
+    if observed > 0:
+        return int(np.count_nonzero(results >= observed - tolerance))
+    return len(results)
+
+
+def _wilson(above, total):
+    q = above / total
+    z2 = AUTO_Z**2
+    center = (q + z2 / (2 * total)) / (1 + z2 / total)
+    margin = AUTO_Z * sqrt(q * (1 - q) / total + z2 / (4 * total**2)) / (1 + z2 / total)
+    return center - margin, center + margin
+
+
+def _settled(above, total, twosided, alpha, tolerance):
+    lower, upper = _wilson(above, total)
+    if twosided:
+        lower *= 2
+        upper *= 2
+    return upper - lower <= 2 * tolerance or upper < alpha or lower > alpha
+
+
+def _count(args, block):
+    kernel, data, observed, twosided, sampler, length = args
+    if isinstance(block, np.ndarray):
+        resamples = block
+    else:
+        size, stream = block
+        resamples = sampler(np.random.default_rng(stream), size, length)
+    results = kernel(data, resamples)
+    if results is None:
+        return None
+    return _above(results, observed, twosided), len(results)
+
+
+def _permtest(kernel, data, observed, twosided, sampler, length, max_perm, seed, chunk, workers, alpha, tolerance):
+    max_perm = _max_perm(max_perm)
+    workers = _workers(workers)
+    size = _chunk_size(length, chunk)
+    auto = max_perm == 'auto'
+    if auto:
+        alpha = _alpha(alpha)
+        tolerance = _tolerance(tolerance)
+        if chunk is None:
+            size = min(size, AUTO_BLOCK)
+        blocks = _random_blocks(AUTO_PERM, size, seed)
+    elif max_perm == 0:
+        cost = _exact_cost(sampler, length)
+        if cost > MAX_EXACT:
+            warn('exact test cost is estimated at {} operations, above MAX_EXACT, falling back to {} random resamples'.format(cost, FALLBACK_PERM))
+            blocks = _random_blocks(FALLBACK_PERM, size, seed)
+        else:
+            blocks = _exact_blocks(length, size)
+    else:
+        blocks = _random_blocks(max_perm, size, seed)
+    args = (kernel, data, observed, twosided, sampler, length)
+    counts = _imap(_count, blocks, workers, args)
+    above = 0
+    total = 0
+    for count in counts:
+        if count is None:
+            return None
+        above += count[0]
+        total += count[1]
+        if auto and _settled(above, total, twosided, alpha, tolerance):
+            break
+    p = above / total
+    if twosided:
+        p *= 2
+    return p, total
+
+
+def _standardize(x):
+    x = x - x.mean()
+    return x / np.sqrt(np.dot(x, x))
+
+
+def _corkernel(data, indices):
+    x, y = data
+    return y[indices] @ x
+
+
+def _cramer(observed, n):
+    rowsums = observed.sum(axis=2, keepdims=True)
+    colsums = observed.sum(axis=1, keepdims=True)
+    totals = rowsums.sum(axis=1, keepdims=True)
+    expected = rowsums * colsums / totals
+    r = np.count_nonzero(rowsums, axis=1)[:, 0]
+    k = np.count_nonzero(colsums, axis=2)[:, 0]
+    diff = observed - expected
+    yates = ((r - 1) * (k - 1) == 1)[:, None, None]
+    diff -= yates * np.sign(diff) * np.minimum(0.5, np.abs(diff))
+    terms = np.divide(diff**2, expected, out=np.zeros_like(diff), where=expected > 0)
+    chi2 = terms.sum(axis=(1, 2))
+    phi2 = np.maximum(0, chi2 / n - ((k - 1) * (r - 1)) / (n - 1))
+    k = k - (k - 1)**2 / (n - 1)
+    r = r - (r - 1)**2 / (n - 1)
+    return np.sqrt(phi2 / np.minimum(k - 1, r - 1))
+
+
+def _welch(sa, qa, la, sb, qb, lb):
+    ma = sa / la
+    mb = sb / lb
+    va = np.maximum(0, qa - sa * ma) / (la - 1)
+    vb = np.maximum(0, qb - sb * mb) / (lb - 1)
+    return (ma - mb) / np.sqrt(va / la + vb / lb)
+
+
+def _indkernel(data, indices):
+    z, length, s, q = data
+    a = z[indices[:, :length]]
+    flat = np.ptp(a, axis=1) == 0
+    if np.any(flat) and np.any(np.ptp(z[indices[flat, length:]], axis=1) == 0):
+        return None
+    sa = a.sum(axis=1)
+    qa = np.einsum('ij,ij->i', a, a)
+    return _welch(sa, qa, length, s - sa, q - qa, len(z) - length)
+
+
+def _relkernel(data, keeps):
+    from scipy.stats import ttest_1samp
+
+    resamples = np.where(keeps, data, -data)
+    if np.any(np.ptp(resamples, axis=1) == 0):
+        return None
+    t, _ = ttest_1samp(resamples, 0, axis=1)
+    return t
+
+
+def _signsums(d):
+    sums = np.zeros(1)
+    for value in d:
+        sums = np.concatenate((sums + value, sums - value))
+    return sums
+
+
+def _signtest(d, observed):
+    if np.ptp(np.abs(d)) == 0:
+        return None
+    length = len(d)
+    half = (length + 1) // 2
+    low = np.sort(_signsums(d[:half]))
+    high = d[half:]
+    bits = min(len(high), SIGN_BITS)
+    middle = _signsums(high[:bits])
+    top = high[bits:]
+    signs = np.ones(len(top))
+    base = top.sum()
+    tolerance = 1e-9 * abs(observed)
+    above = 0
+    for step in range(2**len(top)):
+        if step:
+            j = (step & -step).bit_length() - 1
+            base -= 2 * signs[j] * top[j]
+            signs[j] = -signs[j]
+        sums = base + middle
+        if observed < 0:
+            above += int(np.searchsorted(low, observed + tolerance - sums, 'right').sum())
+        elif observed > 0:
+            above += len(low) * len(sums) - int(np.searchsorted(low, observed - tolerance - sums, 'left').sum())
+        else:
+            above += len(low) * len(sums)
+    total = 2**length
+    return 2 * (above / total), total
+
+
+def _chikernel(data, indices):
+    x, y, rows, cols = data
+    size = len(indices)
+    y = y[indices]
+    valid = (x >= 0) & (y >= 0)
+    codes = (np.arange(size)[:, None] * rows + x) * cols + y
+    observed = np.bincount(codes[valid], minlength=size * rows * cols)
+    return _cramer(observed.reshape(size, rows, cols).astype(float), len(x))
 
 
 def _series(iterable):
@@ -62,28 +368,24 @@ def _iterable(df, key):
     return df[key]
 
 
-def _cortest(x, y, max_perm):
+def _cortest(x, y, max_perm, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    from scipy.stats import pearsonr
+
     x = _series(x)
     y = _series(y)
     r, p = pearsonr(x, y)
+    resamples = None
     if max_perm is not None:
-        population = list(y)
-        if max_perm == 0:
-            resamples = permutations(population)
-        else:
-            resamples = _permutations(population, max_perm)
-        above = 0
-        total = 0
-        for resample in resamples:
-            result, _ = _cortest(x, resample, None)
-            if (r < 0 and result <= r) or r == 0 or (r > 0 and result >= r):
-                above += 1
-            total += 1
-        p = 2 * (above / total)
-    return r, p
-
-
-def _chitest(x, y, max_perm):
+        x = _standardize(x.to_numpy(dtype=float))
+        y = _standardize(y.to_numpy(dtype=float))
+        observed = np.dot(y, x)
+        p, resamples = _permtest(_corkernel, (x, y), observed, True, _permutations, len(y), max_perm, seed, chunk, workers, alpha, tolerance)
+    return r, p, resamples
+
+
+def _chitest(x, y, max_perm, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    from scipy.stats import chi2_contingency
+
     x = _series(x)
     y = _series(y)
     observed = pd.crosstab(x, y)
@@ -94,87 +396,62 @@ def _chitest(x, y, max_perm):
     k -= (k - 1)**2 / (n - 1)
     r -= (r - 1)**2 / (n - 1)
     v = sqrt(phi2 / min(k - 1, r - 1))
+    resamples = None
     if max_perm is not None:
-        population = list(y)
-        if max_perm == 0:
-            resamples = permutations(population)
-        else:
-            resamples = _permutations(population, max_perm)
-        above = 0
-        total = 0
-        for resample in resamples:
-            result, _ = _chitest(x, resample, None)
-            if result >= v:
-                above += 1
-            total += 1
-        p = above / total
-    return v, p
-
-
-def _indtest(a, b, max_perm):
+        x, rows = pd.factorize(x)
+        y, cols = pd.factorize(y)
+        data = (x, y, len(rows), len(cols))
+        observed = _chikernel(data, np.arange(n)[None])[0]
+        p, resamples = _permtest(_chikernel, data, observed, False, _permutations, n, max_perm, seed, chunk, workers, alpha, tolerance)
+    return v, p, resamples
+
+
+def _indtest(a, b, max_perm, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    from scipy.stats import ttest_ind
+
     a = _series(a)
     b = _series(b)
     length = len(a)
     if length < 2 or len(b) < 2 or (_varzero(a) and _varzero(b)):
         return None
     t, p = ttest_ind(a, b, equal_var=False)
+    resamples = None
     if max_perm is not None:
-        population = list(a) + list(b)
-        if max_perm == 0:
-            resamples = permutations(population)
-        else:
-            resamples = _permutations(population, max_perm)
-        above = 0
-        total = 0
-        for resample in resamples:
-            result = _indtest(resample[:length], resample[length:], None)
-            if result is None:
-                return None
-            result = result[0]
-            if (t < 0 and result <= t) or t == 0 or (t > 0 and result >= t):
-                above += 1
-            total += 1
-        p = 2 * (above / total)
-    return t, p
-
-
-def _reltest(a, b, max_perm):
+        z = np.concatenate((a.to_numpy(dtype=float), b.to_numpy(dtype=float)))
+        z -= z.mean()
+        data = (z, length, z.sum(), np.dot(z, z))
+        observed = _indkernel(data, np.arange(len(z))[None])[0]
+        result = _permtest(_indkernel, data, observed, True, _permutations, len(z), max_perm, seed, chunk, workers, alpha, tolerance)
+        if result is None:
+            return None
+        p, resamples = result
+    return t, p, resamples
+
+
+def _reltest(a, b, max_perm, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    from scipy.stats import ttest_rel
+
     a = _series(a)
     b = _series(b)
     length = len(a)
     if length < 2 or length != len(b) or _varzero(A - B for A, B in zip(a, b)):
         return None
     t, p = ttest_rel(a, b)
+    resamples = None
     if max_perm is not None:
-        population = (False, True)
-        if max_perm == 0:
-            resamples = product(population, repeat=length)
+        data = a.to_numpy(dtype=float) - b.to_numpy(dtype=float)
+        if max_perm == 0 and _exact_cost(_product, length) <= MAX_EXACT:
+            result = _signtest(data, data.sum())
         else:
-            resamples = _product(population, length, max_perm)
-        above = 0
-        total = 0
-        for resample in resamples:
-            resample_a = []
-            resample_b = []
-            for i, keep in enumerate(resample):
-                if keep:
-                    resample_a.append(a[i])
-                    resample_b.append(b[i])
-                else:
-                    resample_a.append(b[i])
-                    resample_b.append(a[i])
-            result = _reltest(resample_a, resample_b, None)
-            if result is None:
-                return None
-            result = result[0]
-            if (t < 0 and result <= t) or t == 0 or (t > 0 and result >= t):
-                above += 1
-            total += 1
-        p = 2 * (above / total)
-    return t, p
-
-
-def _crosstab(g, nodes, weight):
+            observed = _relkernel(data, np.ones((1, length), dtype=bool))[0]
+            result = _permtest(_relkernel, data, observed, True, _product, length, max_perm, seed, chunk, workers, alpha, tolerance)
+        if result is None:
+            return None
+        p, resamples = result
+    return t, p, resamples
+
+
+def _incidence(g, nodes, weight):
     try:
         iter(nodes)
     except TypeError:
@@ -187,37 +464,111 @@ def _crosstab(g, nodes, weight):
     if len(nodes) == 0 or len(nodes) == g.number_of_nodes():
         raise ValueError('nodes must be a non-empty proper subset of the graph nodes')
 
-    nodes = [n for n in g.nodes if n in nodes]
-    other = [m for m in g.nodes if m not in nodes]
+    rows = [n for n in g.nodes if n in nodes]
+    cols = [m for m in g.nodes if m not in nodes]
+    row_index = {n: i for i, n in enumerate(rows)}
+    col_index = {m: j for j, m in enumerate(cols)}
+
+    return rows, cols, _incidence_matrix(g, row_index, col_index, weight)
+
+
+def _incidence_matrix(g, row_index, col_index, weight):
+    from scipy import sparse
+
+    directed = isinstance(g, nx.DiGraph)
+    I = []
+    J = []
+    V = []
+    for n, m, value in g.edges(data=weight, default=1):
+        if n in row_index:
+            if m in row_index:
+                raise ValueError('nodes must define a bipartition')
+            I.append(row_index[n])
+            J.append(col_index[m])
+        else:
+            if m not in row_index:
+                raise ValueError('nodes must define a bipartition')
+            if directed:
+                raise ValueError('nodes must define a directed bipartition')
+            I.append(row_index[m])
+            J.append(col_index[n])
+        V.append(value)
+
+    # the missing entries are implicitly sys.float_info.epsilon, so the stored
+    # entries are shifted by it and the shift is added back in each product
+    V = np.array(V, dtype=float) - sys.float_info.epsilon
+    return sparse.csr_matrix((V, (I, J)), shape=(len(row_index), len(col_index)))
+
+
+def _product_ca(matrix, y):
+    return matrix @ y + sys.float_info.epsilon * y.sum(axis=0)
+
+
+def _fit_ca(matrix):
+    from scipy.sparse.linalg import LinearOperator, svds
+
+    R, C = matrix.shape
+    eps = sys.float_info.epsilon
+    total = matrix.sum() + eps * R * C
+    r = (np.asarray(matrix.sum(axis=1)).ravel() + eps * C) / total
+    c = (np.asarray(matrix.sum(axis=0)).ravel() + eps * R) / total
+    dr = r**-0.5
+    dc = c**-0.5
+
+    def matvec(x):
+        y = dc * np.ravel(x)
+        return dr * (_product_ca(matrix, y) / total - r * np.dot(c, y))
+
+    def rmatvec(x):
+        y = dr * np.ravel(x)
+        return dc * (_product_ca(matrix.T, y) / total - c * np.dot(r, y))
+
+    k = min(CA_COMPONENTS, min(R, C) - 1)
+    if R * C <= CA_DENSE:
+        S = dr[:, None] * ((matrix.toarray() + eps) / total - np.outer(r, c)) * dc
+        U, sigma, V = np.linalg.svd(S, full_matrices=False)
+    else:
+        operator = LinearOperator((R, C), matvec=matvec, rmatvec=rmatvec, dtype=float)
+        U, sigma, V = svds(operator, k=k)
+    order = np.argsort(sigma)[::-1][:k]
+    U = U[:, order]
+    sigma = sigma[order]
+    V = V[order]
+
+    signs = np.sign(U[np.argmax(np.abs(U), axis=0), range(k)])
+    signs[signs == 0] = 1
+    U = U * signs
+    V = V * signs[:, None]
 
-    for n, m in g.edges:
-        if (n in nodes and m in nodes) or (n in other and m in other):
-            raise ValueError('nodes must define a bipartition')
-        if isinstance(g, nx.DiGraph) and (n in other and m in nodes):
-            raise ValueError('nodes must define a directed bipartition')
+    pad = CA_COMPONENTS - k
+    U = np.hstack((U, np.zeros((R, pad))))
+    sigma = np.concatenate((sigma, np.zeros(pad)))
+    V = np.vstack((V, np.zeros((pad, C))))
 
-    matrix = []
-    for n in nodes:
-        line = []
-        for m in other:
-            if g.has_edge(n, m):
-                value = g.edges[n, m].get(weight, 1)
-            else:
-                value = sys.float_info.epsilon
-            line.append(value)
-        matrix.append(line)
+    return r, c, U, sigma, V
 
-    return pd.DataFrame(matrix, nodes, other)
 
+def _coordinates_ca(matrix, basis):
+    r, c, U, _, V = basis
+    return _transform_ca(matrix, (c**-0.5)[:, None] * V.T, (r**-0.5)[:, None] * U)
 
-def _project(g, ca, observed):
-    pos = ca.row_coordinates(observed)
-    for n, x, y in zip(observed.index, pos[0], pos[1]):
-        g.nodes[n]['pos'] = (x, y)
 
-    pos = ca.column_coordinates(observed)
-    for m, x, y in zip(observed.columns, pos[0], pos[1]):
-        g.nodes[m]['pos'] = (x, y)
+def _transform_ca(matrix, row_transform, col_transform):
+    R, C = matrix.shape
+    eps = sys.float_info.epsilon
+    rowsums = np.asarray(matrix.sum(axis=1)).ravel() + eps * C
+    colsums = np.asarray(matrix.sum(axis=0)).ravel() + eps * R
+    F = _product_ca(matrix, row_transform) / rowsums[:, None]
+    G = _product_ca(matrix.T, col_transform) / colsums[:, None]
+    return F, G
+
+
+def _project(g, rows, cols, F, G):
+    for n, (x, y) in zip(rows, F[:, :2]):
+        g.nodes[n]['pos'] = (float(x), float(y))
+
+    for m, (x, y) in zip(cols, G[:, :2]):
+        g.nodes[m]['pos'] = (float(x), float(y))
 
 
 def concat(dataframes, key):
@@ -232,6 +583,8 @@ def assign(df, other, key):
 
 
 def distest_loose(x):
+    from scipy.stats import shapiro, normaltest, kstest, norm, powerlaw, expon
+
     x = _series(x)
     data = {
         'Shapiro-Wilk (normal)': shapiro(x),
@@ -249,25 +602,44 @@ def distest(df, x):
     return distest_loose(_iterable(df, x))
 
 
-def cortest_loose(x, y, max_perm=None):
-    r, p = _cortest(x, y, max_perm)
-    return round(r, DEC), round(p, DEC)
+class PValue(float):
+    '''A PValue is a float that also records how many resamples were used to
+    estimate it, so the permutation tests return the same shape in every mode.
+
+    :type value: float
+    :param value: The p-value.
 
+    :type resamples: int
+    :param resamples: The number of resamples, or ``None`` if the p-value is
+                      not estimated by resampling.
+    '''
+    def __new__(cls, value, resamples=None):
+        p = super().__new__(cls, round(value, DEC))
+        p.resamples = resamples
+        return p
 
-def cortest(df, x, y, max_perm=None):
-    return cortest_loose(_iterable(df, x), _iterable(df, y), max_perm)
 
+def cortest_loose(x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    r, p, resamples = _cortest(x, y, max_perm, seed, chunk, workers, alpha, tolerance)
+    return round(r, DEC), PValue(p, resamples)
 
-def chitest_loose(x, y, max_perm=None):
-    v, p = _chitest(x, y, max_perm)
-    return round(v, DEC), round(p, DEC)
 
+def cortest(df, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    return cortest_loose(_iterable(df, x), _iterable(df, y), max_perm, seed, chunk, workers, alpha, tolerance)
 
-def chitest(df, x, y, max_perm=None):
-    return chitest_loose(_iterable(df, x), _iterable(df, y), max_perm)
+
+def chitest_loose(x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    v, p, resamples = _chitest(x, y, max_perm, seed, chunk, workers, alpha, tolerance)
+    return round(v, DEC), PValue(p, resamples)
+
+
+def chitest(df, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    return chitest_loose(_iterable(df, x), _iterable(df, y), max_perm, seed, chunk, workers, alpha, tolerance)
 
 
 def onetest_loose(a, mean):
+    from scipy.stats import ttest_1samp
+
     a = _series(a)
     if len(a) < 2 or _varzero(a):
         return None
@@ -279,47 +651,61 @@ def onetest(df, a, mean):
     return onetest_loose(_iterable(df, a), mean)
 
 
-def indtest_loose(a, b, max_perm=None):
-    result = _indtest(a, b, max_perm)
+def indtest_loose(a, b, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    result = _indtest(a, b, max_perm, seed, chunk, workers, alpha, tolerance)
     if result is None:
         return None
-    return round(result[1], DEC)
+    return PValue(result[1], result[2])
 
 
-def indtest(df, a, b, max_perm=None):
-    return indtest_loose(_iterable(df, a), _iterable(df, b), max_perm)
+def indtest(df, a, b, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    return indtest_loose(_iterable(df, a), _iterable(df, b), max_perm, seed, chunk, workers, alpha, tolerance)
 
 
-def reltest_loose(a, b, max_perm=None):
-    result = _reltest(a, b, max_perm)
+def reltest_loose(a, b, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    result = _reltest(a, b, max_perm, seed, chunk, workers, alpha, tolerance)
     if result is None:
         return None
-    return round(result[1], DEC)
+    return PValue(result[1], result[2])
+
 
+def reltest(df, a, b, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    return reltest_loose(_iterable(df, a), _iterable(df, b), max_perm, seed, chunk, workers, alpha, tolerance)
 
-def reltest(df, a, b, max_perm=None):
-    return reltest_loose(_iterable(df, a), _iterable(df, b), max_perm)
 
+def _mixpair(args):
+    return indtest_loose(*args)
 
-def mixtest_loose(x, y, max_perm=None):
+
+def mixtest_loose(x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
     data = {}
     for X, Y in zip(_series(x), _series(y)):
         if Y not in data:
             data[Y] = []
         data[Y].append(X)
-    result = []
-    index = []
-    for y1, y2 in combinations(data, 2):
-        result.append(indtest_loose(data[y1], data[y2], max_perm))
-        index.append('{}, {}'.format(y1, y2))
-    return pd.DataFrame(result, index, ['p-value'])
+    pairs = list(combinations(data, 2))
+    workers = _workers(workers)
+    if len(pairs) > 1:
+        outer, inner = min(workers, len(pairs)), 1
+    else:
+        outer, inner = 1, workers
+    streams = _seedseq(seed).spawn(len(pairs))
+    tasks = ((data[y1], data[y2], max_perm, stream, chunk, inner, alpha, tolerance) for (y1, y2), stream in zip(pairs, streams))
+    result = list(_imap(_mixpair, tasks, outer))
+    index = ['{}, {}'.format(y1, y2) for y1, y2 in pairs]
+    df = pd.DataFrame(result, index, ['p-value'])
+    # the frame does not keep the attributes of its values, so the counts are kept in its attrs
+    df.attrs['resamples'] = pd.Series([None if r is None else r.resamples for r in result], index, dtype=object)
+    return df
 
 
-def mixtest(df, x, y, max_perm=None):
-    return mixtest_loose(_iterable(df, x), _iterable(df, y), max_perm)
+def mixtest(df, x, y, max_perm=None, seed=None, chunk=None, workers=None, alpha=None, tolerance=None):
+    return mixtest_loose(_iterable(df, x), _iterable(df, y), max_perm, seed, chunk, workers, alpha, tolerance)
 
 
 def linregress_loose(X, y, *args, **kwargs):
+    from statsmodels.api import OLS
+
     X = list(zip(*(_series(x) for x in X)))
     y = _series(y)
     model = OLS(y, X)
@@ -332,6 +718,8 @@ def linregress(df, X, y, *args, **kwargs):
 
 
 def logregress_loose(X, y, *args, **kwargs):
+    from statsmodels.api import Logit
+
     X = list(zip(*(_series(x) for x in X)))
     y = _series(y)
     model = Logit(y, X)
@@ -380,15 +768,21 @@ def binencode(df, x):
 
 
 def resize_next_plot(width, height):
+    plt = _pyplot()
+
     plt.figure(figsize=(width / DPI, height / DPI), dpi=DPI)
 
 
 def resize_all_plots(width, height):
+    plt = _pyplot()
+
     plt.rcParams['figure.figsize'] = (width / DPI, height / DPI)
     plt.rcParams['figure.dpi'] = DPI
 
 
 def displot_loose(x):
+    sns = _seaborn()
+
     sns.distplot(_series(x))
 
 
@@ -397,6 +791,8 @@ def displot(df, x):
 
 
 def barplot_loose(x, control=None):
+    sns = _seaborn()
+
     sns.countplot(_series(x), hue=_series(control))
 
 
@@ -405,6 +801,8 @@ def barplot(df, x, control=None):
 
 
 def linplot_loose(x, y, control=None):
+    sns = _seaborn()
+
     sns.lineplot(_series(x), _series(y), _series(control))
 
 
@@ -413,6 +811,8 @@ def linplot(df, x, y, control=None):
 
 
 def scaplot_loose(x, y, control=None):
+    sns = _seaborn()
+
     sns.scatterplot(_series(x), _series(y), _series(control))
 
 
@@ -421,6 +821,8 @@ def scaplot(df, x, y, control=None):
 
 
 def matplot_loose(X, control=None):
+    sns = _seaborn()
+
     X = [_series(x) for x in (*X, control)]
     for i, x in enumerate(X):
         if x is not None:
@@ -465,9 +867,12 @@ def contable(df, x, y):
 
 
 def corplot_loose(x, y):
+    from prince import CA
+
     observed = pd.crosstab(_series(x), _series(y))
     ca = CA()
     ca.fit(observed)
+    _seaborn()
     ca.plot_coordinates(observed)
 
 
@@ -476,33 +881,33 @@ def corplot(df, x, y):
 
 
 def corplot_twomode(g, nodes, weight='weight'):
-    observed = _crosstab(g, nodes, weight)
-    ca = CA()
-    ca.fit(observed)
-    ca.plot_coordinates(observed)
+    plt = _pyplot()
+
+    rows, cols, matrix = _incidence(g, nodes, weight)
+    F, G = _coordinates_ca(matrix, _fit_ca(matrix))
+    for nodes, coordinates in ((rows, F), (cols, G)):
+        plt.scatter(coordinates[:, 0], coordinates[:, 1])
+        for n, (x, y) in zip(nodes, coordinates[:, :2]):
+            label = get_node_label(g, n)
+            if label is None:
+                label = n
+            plt.annotate(label, (x, y))
 
 
 def analyze_to_move(g, nodes, weight='weight'):
-    observed = _crosstab(g, nodes, weight)
-    ca = CA()
-    ca.fit(observed)
-    _project(g, ca, observed)
+    rows, cols, matrix = _incidence(g, nodes, weight)
+    F, G = _coordinates_ca(matrix, _fit_ca(matrix))
+    _project(g, rows, cols, F, G)
 
 
-def analyze_last_to_move_all(graphs, nodes, weight='weight'):
-    last = graphs[-1]
-    observed = _crosstab(last, nodes, weight)
-    ca = CA()
-    ca.fit(observed)
-    _project(last, ca, observed)
-    for g in graphs[:-1]:
-        if sorted(g.nodes) != sorted(last.nodes):
-            raise ValueError('all graphs must have the same nodes')
-        observed = _crosstab(g, nodes, weight)
-        _project(g, ca, observed)
+def analyze_last_to_move_all(graphs, nodes, weight='weight', workers=None):
+    projection = Projection(graphs[-1], nodes, weight)
+    projection.project_all(graphs, workers)
 
 
 def boxplot_loose(x, y, control=None):
+    sns = _seaborn()
+
     sns.boxplot(_series(x), _series(y), _series(control), orient='h')
 
 
@@ -510,36 +915,68 @@ def boxplot(df, x, y, control=None):
     boxplot_loose(_iterable(df, x), _iterable(df, y), _iterable(df, control))
 
 
-def girvan_newman(g):
-    d = 0.0
+def sampled_edge_selector(k, seed=None, weight=None):
+    rng = Random(seed)
+
+    def select(g):
+        centrality = nx.edge_betweenness_centrality(g, min(k, g.number_of_nodes()), weight=weight, seed=rng)
+        return max(centrality, key=centrality.get)
+
+    return select
+
+
+def _girvan_newman_linkage(g, levels, most_valuable_edge):
+    nodes = list(g.nodes)
+
+    current = None
+    splits = []
+    partitions = nx.community.girvan_newman(g, most_valuable_edge)
+    if levels is not None:
+        partitions = islice(partitions, levels)
+    for C in partitions:
+        C = {frozenset(c) for c in C}
+        if current is not None:
+            for parent in current - C:
+                splits.append([c for c in C - current if c <= parent])
+        current = C
+    if current is None:
+        current = {frozenset(c) for c in nx.connected_components(nx.Graph(g))}
+
+    ids = {frozenset([n]): i for i, n in enumerate(nodes)}
+    alive = {i: 1 for i in range(len(nodes))}
     linkage = []
-    clusters = []
-
-    for C in reversed(list(nx.community.girvan_newman(g))):
-        for c in C:
-            if c not in clusters:
-                if len(c) > 1:
-                    i = 0
-                    while clusters[i] is None or not clusters[i].issubset(c):
-                        i += 1
-                    j = clusters.index(c - clusters[i])
-                    d += 1
-                    linkage.append([i, j, d, len(c)])
-                    clusters[i] = None
-                    clusters[j] = None
-                clusters.append(c)
-
-    while len(linkage) < g.number_of_nodes() - 1:
-        j = len(clusters) - 1
-        i = 0
-        while clusters[i] is None:
-            i += 1
-        c = clusters[i] | clusters[j]
+    d = 0.0
+
+    def merge(a, b):
+        nonlocal d
         d += 1
-        linkage.append([i, j, d, len(c)])
-        clusters[i] = None
-        clusters[j] = None
-        clusters.append(c)
+        size = alive.pop(a) + alive.pop(b)
+        linkage.append([min(a, b), max(a, b), d, size])
+        alive[len(nodes) + len(linkage) - 1] = size
+        return len(nodes) + len(linkage) - 1
+
+    position = {n: i for i, n in enumerate(nodes)}
+    for c in sorted(current, key=lambda c: min(position[n] for n in c)):
+        if len(c) > 1:
+            members = sorted(c, key=position.get)
+            i = position[members[0]]
+            for n in members[1:]:
+                i = merge(i, position[n])
+            ids[c] = i
+
+    for c1, c2 in reversed(splits):
+        ids[c1 | c2] = merge(ids[c1], ids[c2])
+
+    while len(alive) > 1:
+        merge(next(iter(alive)), next(reversed(alive)))
+
+    return linkage
+
+
+def girvan_newman(g, levels=None, most_valuable_edge=None):
+    from scipy.cluster.hierarchy import dendrogram
+
+    linkage = _girvan_newman_linkage(g, levels, most_valuable_edge)
 
     labels = []
     for n in g.nodes:
@@ -548,8 +985,80 @@ def girvan_newman(g):
             label = n
         labels.append(label)
 
+    _seaborn()
     dendrogram(linkage, orientation='right', labels=labels)
 
 
-if sns is not None:
-    sns.set()
+class Projection:
+    '''A Projection is a correspondence analysis of a two-mode graph that can
+    be applied to other graphs with the same nodes.
+
+    The row and column orderings, the fitted basis, and the matrices that
+    project row and column profiles are computed once, so projecting another
+    graph costs one sparse matrix product for each mode.
+
+    :type g: NetworkX Graph or DiGraph
+    :param g: The graph to fit.
+
+    :type nodes: iterable
+    :param nodes: The nodes of one of the two modes.
+
+    :type weight: str
+    :param weight: The edge attribute used as weight.
+    '''
+    def __init__(self, g, nodes, weight='weight'):
+        self.rows, self.cols, matrix = _incidence(g, nodes, weight)
+        self.weight = weight
+        self.basis = _fit_ca(matrix)
+
+        r, c, U, _, V = self.basis
+        self._row_index = {n: i for i, n in enumerate(self.rows)}
+        self._col_index = {m: j for j, m in enumerate(self.cols)}
+        self._row_transform = (c**-0.5)[:, None] * V.T
+        self._col_transform = (r**-0.5)[:, None] * U
+
+    def transform(self, g):
+        '''Compute the coordinates of a graph.
+
+        :type g: NetworkX Graph or DiGraph
+        :param g: The graph to transform. Must have the same nodes as the
+                  fitted graph.
+
+        :rtype: tuple
+        :return: The row coordinates and the column coordinates.
+        '''
+        if g.number_of_nodes() != len(self.rows) + len(self.cols) or any(n not in self._row_index and n not in self._col_index for n in g.nodes):
+            raise ValueError('all graphs must have the same nodes')
+        matrix = _incidence_matrix(g, self._row_index, self._col_index, self.weight)
+        return _transform_ca(matrix, self._row_transform, self._col_transform)
+
+    def project(self, g):
+        '''Move the nodes of a graph to their coordinates.
+
+        :type g: NetworkX Graph or DiGraph
+        :param g: The graph to project. Must have the same nodes as the
+                  fitted graph.
+        '''
+        F, G = self.transform(g)
+        _project(g, self.rows, self.cols, F, G)
+
+    def project_all(self, graphs, workers=None):
+        '''Move the nodes of several graphs to their coordinates.
+
+        :type graphs: list
+        :param graphs: The graphs to project. Must have the same nodes as the
+                       fitted graph.
+
+        :type workers: int
+        :param workers: Number of processes. If ``None``, uses ``WORKERS``.
+        '''
+        workers = min(_workers(workers), max(1, len(graphs)))
+        if workers == 1:
+            coordinates = map(self.transform, graphs)
+        else:
+            # proxies such as freeman.Graph are not picklable, so the
+            # wrapped graphs are sent instead
+            wrapped = (getattr(g, '__wrapped__', g) for g in graphs)
+            coordinates = _imap(Projection.transform, wrapped, workers, self)
+        for g, (F, G) in zip(graphs, coordinates):
+            _project(g, self.rows, self.cols, F, G)
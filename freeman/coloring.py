@@ -0,0 +1,270 @@
+'''Module responsible for parsing, formatting and converting colors.
+
+A graph usually has a few distinct colors repeated over many nodes and edges,
+so the conversions below are memoized: each distinct color is processed once
+and the next ones are table lookups. The returned colors are interned, which
+means that equal conversions return the same tuple.
+
+Each function has a bulk version that receives a list of colors, or lists of
+components, and returns a list of results.
+'''
+from functools import lru_cache
+from colorsys import rgb_to_hsv, hsv_to_rgb
+
+
+# bounded, since continuous maps such as heat_nodes produce many distinct colors
+COLOR_CACHE = 65536
+
+
+def _correct(c):
+    sc = c / 255
+
+    if sc > 0.03928:
+        return ((sc + 0.055) / 1.055)**2.4
+
+    return sc / 12.92
+
+
+CORRECTIONS = [_correct(c) for c in range(256)]
+
+
+@lru_cache(COLOR_CACHE)
+def _parse_color(value):
+    line = value.strip()
+    if line.startswith('rgb(') or line.startswith('rgba('):
+        if not line.endswith(')'):
+            raise ValueError('rgb and rgba must end with \')\'')
+        length = line.find('(')
+        phrase = line[(length + 1):-1]
+        if phrase.find('(') != -1 or phrase.find(')') != -1:
+            raise ValueError('rgb and rgba must have only one \'(\' and only one \')\'')
+
+        words = phrase.split(',')
+        if len(words) != length:
+            if length == 3:
+                raise ValueError('rgb must have three components')
+            else:
+                raise ValueError('rgba must have four components')
+
+        r = int(words[0])
+        g = int(words[1])
+        b = int(words[2])
+        if r < 0 or r > 255 or g < 0 or g > 255 or b < 0 or b > 255:
+            raise ValueError('rgb channels must be between 0 and 255')
+        if length == 4:
+            a = float(words[3])
+            if a < 0 or a > 1:
+                raise ValueError('rgba alpha must be between 0 and 1')
+            return (r, g, b, a)
+        else:
+            return (r, g, b)
+
+    return value
+
+
+# the caches below are typed, so 1 and 1.0 or True are never confused
+
+
+@lru_cache(COLOR_CACHE, typed=True)
+def _format_color(r, g, b, a=None):
+    if a is None:
+        return 'rgb({}, {}, {})'.format(r, g, b)
+
+    return 'rgba({}, {}, {}, {})'.format(r, g, b, round(a, 6))
+
+
+@lru_cache(COLOR_CACHE, typed=True)
+def _color_to_hsv(r, g, b):
+    if not isinstance(r, int) or not isinstance(g, int) or not isinstance(b, int):
+        raise TypeError('all color elements must be integers')
+    if r < 0 or r > 255 or g < 0 or g > 255 or b < 0 or b > 255:
+        raise ValueError('all color elements must be between 0 and 255')
+
+    return rgb_to_hsv(r / 255, g / 255, b / 255)
+
+
+@lru_cache(COLOR_CACHE, typed=True)
+def _hsv_to_color(h, s, v):
+    sr, sg, sb = hsv_to_rgb(h, s, v)
+
+    r = round(sr * 255)
+    g = round(sg * 255)
+    b = round(sb * 255)
+
+    return r, g, b
+
+
+@lru_cache(COLOR_CACHE, typed=True)
+def _luminance(r, g, b):
+    # checked before indexing, since a negative integer would silently wrap
+    if r < 0 or r > 255 or g < 0 or g > 255 or b < 0 or b > 255:
+        raise ValueError('all color elements must be between 0 and 255')
+
+    if isinstance(r, int) and isinstance(g, int) and isinstance(b, int):
+        r = CORRECTIONS[r]
+        g = CORRECTIONS[g]
+        b = CORRECTIONS[b]
+    else:
+        r = _correct(r)
+        g = _correct(g)
+        b = _correct(b)
+
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def parse_color(value):
+    '''Parse a color string.
+
+    :type value: str
+    :param value: A string of the form ``'rgb(r, g, b)'`` or ``'rgba(r, g, b, a)'``.
+                  Any other value is returned as it is.
+
+    :rtype: tuple
+    :return: The color as a tuple of three integers, or of three integers and
+             a float.
+    '''
+    # only color strings are memoized, so labels and other strings do not fill the cache
+    if isinstance(value, str) and value.lstrip().startswith('rgb'):
+        return _parse_color(value)
+
+    return value
+
+
+def parse_colors(values):
+    '''Parse a list of color strings. See :func:`parse_color <freeman.coloring.parse_color>`.
+
+    :type values: list
+    :param values: The strings.
+
+    :rtype: list
+    :return: The colors.
+    '''
+    return [parse_color(value) for value in values]
+
+
+def format_color(color):
+    '''Format a color as a string.
+
+    :type color: tuple
+    :param color: A tuple or list of three or four elements.
+
+    :rtype: str
+    :return: A string of the form ``'rgb(r, g, b)'`` or ``'rgba(r, g, b, a)'``,
+             where the alpha is rounded to six digits.
+    '''
+    return _format_color(*color)
+
+
+def format_colors(colors):
+    '''Format a list of colors. See :func:`format_color <freeman.coloring.format_color>`.
+
+    :type colors: list
+    :param colors: The colors.
+
+    :rtype: list
+    :return: The strings.
+    '''
+    return [_format_color(*color) for color in colors]
+
+
+def color_to_hsv(color):
+    '''Convert a color to the HSV space.
+
+    :type color: tuple
+    :param color: A tuple or list of three integers between ``0`` and ``255``.
+
+    :rtype: tuple
+    :return: The hue, saturation and value, between ``0`` and ``1``.
+    '''
+    if not isinstance(color, (tuple, list)):
+        raise TypeError('color must be a tuple or list')
+    if len(color) != 3:
+        raise ValueError('color must have exactly three elements')
+
+    return _color_to_hsv(*color)
+
+
+def colors_to_hsv(colors):
+    '''Convert a list of colors to the HSV space. See :func:`color_to_hsv
+    <freeman.coloring.color_to_hsv>`.
+
+    :type colors: list
+    :param colors: The colors.
+
+    :rtype: list
+    :return: The hue, saturation and value tuples.
+    '''
+    return [color_to_hsv(color) for color in colors]
+
+
+def hsv_to_color(h, s, v):
+    '''Convert a point of the HSV space to a color.
+
+    :type h: float
+    :param h: The hue, between ``0`` and ``1``.
+
+    :type s: float
+    :param s: The saturation, between ``0`` and ``1``.
+
+    :type v: float
+    :param v: The value, between ``0`` and ``1``.
+
+    :rtype: tuple
+    :return: The color as a tuple of three integers between ``0`` and ``255``.
+    '''
+    return _hsv_to_color(h, s, v)
+
+
+def hsv_to_colors(H, S, V):
+    '''Convert lists of HSV components to colors. See :func:`hsv_to_color
+    <freeman.coloring.hsv_to_color>`.
+
+    :type H: list
+    :param H: The hues.
+
+    :type S: list
+    :param S: The saturations.
+
+    :type V: list
+    :param V: The values.
+
+    :rtype: list
+    :return: The colors.
+    '''
+    return [_hsv_to_color(h, s, v) for h, s, v in zip(H, S, V)]
+
+
+def luminance(color):
+    '''Compute the relative luminance of a color, after gamma correction.
+
+    :type color: tuple
+    :param color: A tuple or list of three or four elements. The fourth is ignored.
+
+    :rtype: float
+    :return: The luminance, between ``0`` and ``1``.
+    '''
+    return _luminance(color[0], color[1], color[2])
+
+
+def is_dark(color):
+    '''Check whether black text has too little contrast over a color.
+
+    :type color: tuple
+    :param color: A tuple or list of three or four elements. The fourth is ignored.
+
+    :rtype: bool
+    :return: Whether white text should be used instead.
+    '''
+    return (_luminance(color[0], color[1], color[2]) + 0.05)**2 < 0.0525
+
+
+def are_dark(colors):
+    '''Check a list of colors. See :func:`is_dark <freeman.coloring.is_dark>`.
+
+    :type colors: list
+    :param colors: The colors.
+
+    :rtype: list
+    :return: The checks.
+    '''
+    return [is_dark(color) for color in colors]
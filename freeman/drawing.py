@@ -115,18 +115,38 @@ attribute does not exist, its default value is considered.
 ============================  =
 '''
 import os
-import plotly
+import re
+import json
 
+import numpy as np
 import networkx as nx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from gzip import GzipFile
+from uuid import uuid4
+from base64 import b64encode
+from hashlib import sha1
 from warnings import warn
+from itertools import chain
 from math import isclose, sqrt, cos, sin
-from IPython.display import display
-from pyvis.network import Network
+
+from .coloring import format_color, is_dark, are_dark
+from .parallel import _imap
 
 
 CACHE_DIR = '__fmcache__'
 
+CACHE_LIMIT = 256 * 1024 * 1024
+
+CACHE_PATTERN = re.compile(r'[0-9a-f]{40}\.(json|html)')
+
+# part of every cache key, so it must be increased whenever a change in the code changes the rendered files
+CACHE_FORMAT = 1
+
 NODE_STYLES = {
     'circle': 'dot',
     'star': 'star',
@@ -148,6 +168,69 @@ EDGE_STYLES = {
     'dashdot': [10, 3, 2, 3],
 }
 
+BACKENDS = ['svg', 'webgl']
+
+SAVE_FORMATS = ['json', 'html']
+
+PLOTLY_URL = 'https://cdn.plot.ly/plotly-2.35.2.min.js'
+
+# the notebook and the files share this markup, so they cannot load different versions of plotly.js
+FIGURE_HTML = '''<div id="{id}"></div>
+<script type="text/javascript">
+(function() {{
+    var figure = {figure};
+    figure.config = {config};
+    function render(Plotly) {{
+        Plotly.newPlot("{id}", figure).then(function() {{
+            if ({play} && figure.frames) {{
+                Plotly.animate("{id}", null);
+            }}
+        }});
+    }}
+    if (window.Plotly) {{
+        render(window.Plotly);
+    }} else if (typeof require === "function") {{
+        require.config({{paths: {{plotly: "{plotly}"}}}});
+        require(["plotly"], render);
+    }} else {{
+        var script = document.createElement("script");
+        script.src = "{plotly}.js";
+        script.onload = function() {{
+            render(window.Plotly);
+        }};
+        document.head.appendChild(script);
+    }}
+}})();
+</script>
+'''
+
+PAGE_HTML = '''<html>
+<head>
+<meta charset="utf-8"/>
+<script src="{plotly}.js"></script>
+</head>
+<body>
+''' + FIGURE_HTML + '''</body>
+</html>
+'''
+
+
+def _format_html(template, id, figure, config, play):
+    # requirejs appends the extension itself, so the url is given without it
+    return template.format(id=id, plotly=PLOTLY_URL[:-3], figure=figure, config=json.dumps(config), play=json.dumps(play))
+
+
+# an animation is streamed between these two halves, so its frames are never joined in memory
+HTML_HEAD, HTML_TAIL = _format_html(PAGE_HTML, 'figure', '{figure}', {'displayModeBar': False}, False).split('{figure}')
+
+WEBGL_THRESHOLD = 10000
+
+GRAPH_ATTRIBUTES = ['width', 'height', 'bottom', 'left', 'right', 'top', 'awidth', 'acolor']
+
+NODE_ATTRIBUTES = ['pos', 'label', 'extra', 'size', 'style', 'color', 'bwidth', 'bcolor', 'labpos']
+
+EDGE_ATTRIBUTES = ['label', 'width', 'style', 'color', 'labflip', 'labdist', 'labfrac']
+
 
 graph_width = 800
 graph_height = 450
@@ -176,17 +259,16 @@ edge_labfrac = 0.5
 def _scale(dx, dy, width, height, size):
     d2 = (dx * width)**2 + (dy * height)**2
 
-    if isclose(d2, 0):
-        return dx, dy
+    zero = d2 == 0
 
-    s = sqrt(size**2 / d2)
+    s = np.sqrt(size**2 / np.where(zero, 1, d2))
 
-    return s * dx, s * dy
+    return np.where(zero, dx, s * dx), np.where(zero, dy, s * dy)
 
 
 def _rotate(dx, dy, width, height, angle):
-    dx *= width
-    dy *= height
+    dx = dx * width
+    dy = dy * height
 
     rx = dx * cos(angle) - dy * sin(angle)
     ry = dx * sin(angle) + dy * cos(angle)
@@ -194,38 +276,6 @@ def _rotate(dx, dy, width, height, angle):
     return rx / width, ry / height
 
 
-def _correct(c):
-    sc = c / 255
-
-    if sc > 0.03928:
-        return ((sc + 0.055) / 1.055)**2.4
-
-    return sc / 12.92
-
-
-def _toodark(color):
-    r = _correct(color[0])
-    g = _correct(color[1])
-    b = _correct(color[2])
-
-    contrast = (0.2126 * r + 0.7152 * g + 0.0722 * b + 0.05)**2
-
-    return contrast < 0.0525
-
-
-def _convert(color):
-    r = color[0]
-    g = color[1]
-    b = color[2]
-
-    if len(color) == 4:
-        a = round(color[3], 6)
-
-        return 'rgba({}, {}, {}, {})'.format(r, g, b, a)
-
-    return 'rgb({}, {}, {})'.format(r, g, b)
-
-
 def _normalize(value, lower, delta):
     if isclose(delta, 0):
         return 0.5
@@ -253,9 +303,9 @@ def _build_graph_height(g):
     return height
 
 
-def _build_graph_plane(g):
+def _build_graph_limits(g):
     if g.number_of_nodes() == 0:
-        return None, (0.5, 0.5)
+        return None
 
     X = []
     Y = []
@@ -272,10 +322,38 @@ def _build_graph_plane(g):
         X.append(pos[0])
         Y.append(pos[1])
 
-    xmin = min(X)
-    xdif = max(X) - xmin
-    ymin = min(Y)
-    ydif = max(Y) - ymin
+    return min(X), max(X), min(Y), max(Y)
+
+
+def _build_graph_fingerprint(g):
+    nodes = sorted(map(repr, g.nodes))
+    if isinstance(g, nx.DiGraph):
+        edges = sorted((repr(n), repr(m)) for n, m in g.edges)
+    else:
+        edges = sorted(tuple(sorted((repr(n), repr(m)))) for n, m in g.edges)
+
+    # the representations are sorted, so the digest does not depend on the iteration order
+    digest = sha1()
+    _update_digest(digest, nodes, edges)
+    return g.number_of_nodes(), g.number_of_edges(), digest.hexdigest()
+
+
+def _merge_graph_limits(limits, other):
+    if limits is None:
+        return other
+    if other is None:
+        return limits
+
+    return min(limits[0], other[0]), max(limits[1], other[1]), min(limits[2], other[2]), max(limits[3], other[3])
+
+
+def _build_graph_bounds(limits):
+    if limits is None:
+        return None, (0.5, 0.5)
+
+    xmin, xmax, ymin, ymax = limits
+    xdif = xmax - xmin
+    ydif = ymax - ymin
 
     x = _normalize(0, xmin, xdif)
     y = _normalize(0, ymin, ydif)
@@ -283,6 +361,10 @@ def _build_graph_plane(g):
     return (xmin, xdif, ymin, ydif), (x, y)
 
 
+def _build_graph_plane(g):
+    return _build_graph_bounds(_build_graph_limits(g))
+
+
 def _build_graph_key(g):
     bottom = g.graph.get('bottom', graph_bottom)
     if not isinstance(bottom, int):
@@ -443,6 +525,100 @@ def _build_edge_key(g, n, m):
     return n_size, m_size, width, style, color, labflip, labdist, labfrac
 
 
+def _valid(values, lower, upper=None, numeric=False):
+    types = {int, bool, float} if numeric else {int, bool}
+    if not set(map(type, values)) <= types:
+        return False
+    if not values:
+        return True
+    array = np.array(values)
+    if not (array >= lower).all():
+        return False
+    return upper is None or bool((array <= upper).all())
+
+
+def _valid_colors(colors, alpha):
+    if not set(map(type, colors)) <= {tuple, list}:
+        return False
+    lengths = set(map(len, colors))
+    if not lengths <= ({3, 4} if alpha else {3}):
+        return False
+    if 4 in lengths:
+        if not _valid([c[3] for c in colors if len(c) == 4], 0, 1, True):
+            return False
+        colors = [c[:3] for c in colors]
+    return _valid(list(chain.from_iterable(colors)), 0, 255)
+
+
+def _valid_labpos(labpos):
+    if labpos == 'hover':
+        return True
+    words = labpos.split()
+    return len(words) == 2 and words[0] in ('bottom', 'middle', 'top') and words[1] in ('left', 'center', 'right')
+
+
+def _build_edges(g):
+    valid = []
+    for n, m in g.edges:
+        if n == m:
+            warn('self loops are not supported, ignoring')
+        else:
+            valid.append((n, m))
+
+    return valid
+
+
+def _build_reciprocal(g, edges):
+    lookup = set(g.edges)
+
+    return [(m, n) in lookup for n, m in edges]
+
+
+def _build_node_keys(g, nodes):
+    data = [g.nodes[n] for n in nodes]
+    sizes = [d.get('size', node_size) for d in data]
+    styles = [d.get('style', node_style) for d in data]
+    colors = [d.get('color', node_color) for d in data]
+    bwidths = [d.get('bwidth', node_bwidth) for d in data]
+    bcolors = [d.get('bcolor', node_bcolor) for d in data]
+    labposes = [d.get('labpos', node_labpos) for d in data]
+
+    # the checks below only accept, so the first offending node is reported by the scalar checks
+    if (_valid(sizes, 1) and
+            set(map(type, styles)) <= {str} and set(styles) <= NODE_STYLES.keys() and
+            _valid_colors(colors, False) and
+            _valid(bwidths, 0) and
+            _valid_colors(bcolors, False) and
+            set(map(type, labposes)) <= {str} and all(_valid_labpos(labpos) for labpos in set(labposes))):
+        return list(zip(sizes, styles, colors, bwidths, bcolors, labposes))
+
+    return [_build_node_key(g, n) for n in nodes]
+
+
+def _build_edge_keys(g, edges):
+    data = [g.edges[n, m] for n, m in edges]
+    sizes = {n: d.get('size', node_size) for n, d in g.nodes(data=True)}
+    n_sizes = [sizes[n] for n, _ in edges]
+    m_sizes = [sizes[m] for _, m in edges]
+    widths = [d.get('width', edge_width) for d in data]
+    styles = [d.get('style', edge_style) for d in data]
+    colors = [d.get('color', edge_color) for d in data]
+    labflips = [d.get('labflip', edge_labflip) for d in data]
+    labdists = [d.get('labdist', edge_labdist) for d in data]
+    labfracs = [d.get('labfrac', edge_labfrac) for d in data]
+
+    # the checks below only accept, so the first offending edge is reported by the scalar checks
+    if (_valid(widths, 1) and
+            set(map(type, styles)) <= {str} and set(styles) <= EDGE_STYLES.keys() and
+            _valid_colors(colors, True) and
+            set(map(type, labflips)) <= {bool} and
+            _valid(labdists, 0) and
+            _valid(labfracs, 0, 1, True)):
+        return list(zip(n_sizes, m_sizes, widths, styles, colors, labflips, labdists, labfracs))
+
+    return [_build_edge_key(g, n, m) for n, m in edges]
+
+
 def _build_graph_trace(g, origin, awidth, acolor):
     return {
         'x': [origin[0], origin[0], None, 0, 1, None],
@@ -452,7 +628,7 @@ def _build_graph_trace(g, origin, awidth, acolor):
         'line': {
             'width': awidth,
             'dash': 'solid',
-            'color': _convert(acolor),
+            'color': format_color(acolor),
         },
     }
 
@@ -473,7 +649,7 @@ def _build_node_trace(size, style, color, bwidth, bcolor, labpos, hidden):
     if hidden:
         textcolor = (255, 255, 255, 0)
     else:
-        if textposition == 'middle center' and _toodark(color):
+        if textposition == 'middle center' and is_dark(color):
             textcolor = (255, 255, 255)
         else:
             textcolor = (0, 0, 0)
@@ -487,15 +663,15 @@ def _build_node_trace(size, style, color, bwidth, bcolor, labpos, hidden):
         'marker': {
             'size': size,
             'symbol': style,
-            'color': _convert(color),
+            'color': format_color(color),
             'line': {
                 'width': bwidth,
-                'color': _convert(bcolor),
+                'color': format_color(bcolor),
             },
         },
         'textposition': textposition,
         'textfont': {
-            'color': _convert(textcolor),
+            'color': format_color(textcolor),
         },
     }
 
@@ -527,11 +703,70 @@ def _build_node_extra_trace(color):
         'mode': 'text',
         'textposition': 'middle center',
         'textfont': {
-            'color': _convert(color),
+            'color': format_color(color),
         },
     }
 
 
+def _build_node_points_trace():
+    return {
+        'x': [],
+        'y': [],
+        'text': [],
+        'hovertext': [],
+        'hoverinfo': [],
+        'mode': 'markers+text',
+        'marker': {
+            'size': [],
+            'symbol': [],
+            'color': [],
+            'line': {
+                'width': [],
+                'color': [],
+            },
+        },
+        'textposition': [],
+        'textfont': {
+            'color': [],
+        },
+    }
+
+
+def _build_node_extra_points_trace():
+    return {
+        'x': [],
+        'y': [],
+        'text': [],
+        'hoverinfo': 'none',
+        'mode': 'text',
+        'textposition': 'middle center',
+        'textfont': {
+            'color': [],
+        },
+    }
+
+
+def _add_node_point(node_points_trace, node_extra_points_trace, node_trace, node_extra_trace):
+    marker = node_trace['marker']
+    node_points_trace['marker']['size'].append(marker['size'])
+    node_points_trace['marker']['symbol'].append(marker['symbol'])
+    node_points_trace['marker']['color'].append(marker['color'])
+    node_points_trace['marker']['line']['width'].append(marker['line']['width'])
+    node_points_trace['marker']['line']['color'].append(marker['line']['color'])
+
+    # a hover label must not be shown as text, because the trace mode is shared
+    if node_trace['hoverinfo'] == 'text':
+        node_points_trace['hovertext'].append(node_points_trace['text'][-1])
+        node_points_trace['text'][-1] = None
+    else:
+        node_points_trace['hovertext'].append(None)
+    node_points_trace['hoverinfo'].append(node_trace['hoverinfo'])
+    node_points_trace['textposition'].append(node_trace['textposition'])
+    node_points_trace['textfont']['color'].append(node_trace['textfont']['color'])
+
+    node_extra_points_trace['textfont']['color'].append(node_extra_trace['textfont']['color'])
+
+
 def _build_edge_trace(width, style, color):
     return {
         'x': [],
@@ -541,7 +776,7 @@ def _build_edge_trace(width, style, color):
         'line': {
             'width': width,
             'dash': style,
-            'color': _convert(color),
+            'color': format_color(color),
         },
     }
 
@@ -609,60 +844,600 @@ def _add_node(g, n, pos, node_trace, node_extra_trace, labpos):
     node_extra_trace['text'].append(extra)
 
 
-def _add_edge(g, n, m, pos, edge_trace, edge_label_trace, width, height, n_size, m_size, labflip, labdist, labfrac):
-    x0, y0 = pos[n]
-    x1, y1 = pos[m]
-
+def _build_edge_geometry(X0, Y0, X1, Y1, width, height, n_sizes, m_sizes, labflips, labdists, labfracs, directed, reciprocal):
     # parameters estimated from screenshots
     width = 0.9 * width - 24
     height = 0.9 * height - 24
 
     ratio = width / height
-    dx = (y0 - y1) / ratio
-    dy = (x1 - x0) * ratio
+    dx = (Y0 - Y1) / ratio
+    dy = (X1 - X0) * ratio
 
-    if isinstance(g, nx.DiGraph) and g.has_edge(m, n):
-        edge_space = max(0, min(EDGE_SPACE, n_size - 2, m_size - 2))
+    if directed:
+        edge_space = np.maximum(0, np.minimum(np.minimum(EDGE_SPACE, n_sizes - 2), m_sizes - 2))
         sx, sy = _scale(dx, dy, width, height, edge_space / 2)
-        x0 += sx
-        y0 += sy
-        x1 += sx
-        y1 += sy
-
-    edge_trace['x'].extend([x0, x1, None])
-    edge_trace['y'].extend([y0, y1, None])
-
-    if labflip:
-        dx = -dx
-        dy = -dy
-    sx, sy = _scale(dx, dy, width, height, labdist)
-    edge_label_trace['x'].append(x0 + labfrac * (x1 - x0) + sx)
-    edge_label_trace['y'].append(y0 + labfrac * (y1 - y0) + sy)
-    edge_label_trace['text'].append(get_edge_label(g, n, m))
+        X0 = np.where(reciprocal, X0 + sx, X0)
+        Y0 = np.where(reciprocal, Y0 + sy, Y0)
+        X1 = np.where(reciprocal, X1 + sx, X1)
+        Y1 = np.where(reciprocal, Y1 + sy, Y1)
 
-    if isinstance(g, nx.DiGraph):
-        dx = x0 - x1
-        dy = y0 - y1
+    segments = [(X0, Y0, X1, Y1, np.ones(len(X0), dtype=bool))]
 
-        radius = m_size / 2
+    dx = np.where(labflips, -dx, dx)
+    dy = np.where(labflips, -dy, dy)
+    sx, sy = _scale(dx, dy, width, height, labdists)
+    LX = X0 + labfracs * (X1 - X0) + sx
+    LY = Y0 + labfracs * (Y1 - Y0) + sy
+
+    if directed:
+        dx = X0 - X1
+        dy = Y0 - Y1
+
+        radius = m_sizes / 2
         sx, sy = _scale(dx, dy, width, height, radius)
-        x0 = x1 + sx
-        y0 = y1 + sy
-        edge_size = max(1, min(EDGE_SIZE, radius))
+        X0 = X1 + sx
+        Y0 = Y1 + sy
+        edge_size = np.maximum(1, np.minimum(EDGE_SIZE, radius))
         sx, sy = _scale(dx, dy, width, height, edge_size)
 
         rx, ry = _rotate(sx, sy, width, height, -EDGE_ANGLE)
-        x1 = x0 + rx
-        y1 = y0 + ry
-        edge_trace['x'].extend([x0, x1, None])
-        edge_trace['y'].extend([y0, y1, None])
+        segments.append((X0, Y0, X0 + rx, Y0 + ry, segments[0][4]))
+
+        rx, ry = _rotate(sx, sy, width, height, EDGE_ANGLE)
+        segments.append((X0, Y0, X0 + rx, Y0 + ry, ~reciprocal))
+
+    return segments, LX, LY
+
+
+def _add_edges(coords, labels, keys, directed, reciprocal, edge_traces, edge_label_trace, width, height):
+    if not keys:
+        return
+
+    X0, Y0, X1, Y1 = np.array(coords, dtype=float).T
+    n_sizes, m_sizes, _, _, _, labflips, labdists, labfracs = zip(*keys)
+    n_sizes = np.array(n_sizes)
+    m_sizes = np.array(m_sizes)
+    labflips = np.array(labflips, dtype=bool)
+    labdists = np.array(labdists)
+    labfracs = np.array(labfracs, dtype=float)
+    reciprocal = np.array(reciprocal, dtype=bool)
+
+    segments, LX, LY = _build_edge_geometry(X0, Y0, X1, Y1, width, height, n_sizes, m_sizes, labflips, labdists, labfracs, directed, reciprocal)
+
+    groups = {}
+    for i, edge_trace in enumerate(edge_traces):
+        if id(edge_trace) not in groups:
+            groups[id(edge_trace)] = (edge_trace, [])
+        groups[id(edge_trace)][1].append(i)
+
+    for edge_trace, indices in groups.values():
+        X = np.empty((len(indices), 3 * len(segments)), dtype=object)
+        Y = np.empty((len(indices), 3 * len(segments)), dtype=object)
+        keep = np.empty((len(indices), 3 * len(segments)), dtype=bool)
+        for j, (SX0, SY0, SX1, SY1, mask) in enumerate(segments):
+            X[:, 3 * j] = SX0[indices]
+            X[:, 3 * j + 1] = SX1[indices]
+            Y[:, 3 * j] = SY0[indices]
+            Y[:, 3 * j + 1] = SY1[indices]
+            keep[:, 3 * j:3 * j + 3] = mask[indices, None]
+        edge_trace['x'].extend(X[keep].tolist())
+        edge_trace['y'].extend(Y[keep].tolist())
+
+    edge_label_trace['x'].extend(LX.tolist())
+    edge_label_trace['y'].extend(LY.tolist())
+    edge_label_trace['text'].extend(labels)
+
+
+def _diff(previous, current):
+    delta = {}
+    for key, value in current.items():
+        if isinstance(value, dict) and isinstance(previous.get(key), dict):
+            value = _diff(previous[key], value)
+            if value:
+                delta[key] = value
+        elif key not in previous or previous[key] != value:
+            delta[key] = value
+
+    return delta
+
+
+def _encode_frame(previous, frame):
+    data = []
+    traces = []
+    for i, trace in enumerate(frame['data']):
+        if i < len(previous['data']):
+            trace = _diff(previous['data'][i], trace)
+        if trace:
+            data.append(trace)
+            traces.append(i)
+
+    # plotly resolves the chain of base frames when jumping to a frame
+    return {
+        'name': frame['name'],
+        'baseframe': previous['name'],
+        'data': data,
+        'traces': traces,
+    }
+
+
+def _same(a, b):
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _diff_attrs(previous, current):
+    changed = {key: value for key, value in current.items() if key not in previous or not _same(previous[key], value)}
+    removed = [key for key in previous if key not in current]
+
+    return changed, removed
+
+
+def _apply_attrs(attrs, delta):
+    changed, removed = delta
+    for key in removed:
+        del attrs[key]
+    attrs.update(changed)
+
+
+def _diff_graph(g, h):
+    graph = _diff_attrs(g.graph, h.graph)
+    removed_nodes = [n for n in g.nodes if not h.has_node(n)]
+    removed_edges = [(n, m) for n, m in g.edges if not h.has_edge(n, m)]
+    added_nodes = [(n, dict(h.nodes[n])) for n in h.nodes if not g.has_node(n)]
+    added_edges = [(n, m, dict(h.edges[n, m])) for n, m in h.edges if not g.has_edge(n, m)]
+    nodes = {}
+    for n in h.nodes:
+        if g.has_node(n):
+            delta = _diff_attrs(g.nodes[n], h.nodes[n])
+            if delta[0] or delta[1]:
+                nodes[n] = delta
+    edges = {}
+    for n, m in h.edges:
+        if g.has_edge(n, m):
+            delta = _diff_attrs(g.edges[n, m], h.edges[n, m])
+            if delta[0] or delta[1]:
+                edges[n, m] = delta
 
-        if not g.has_edge(m, n):
-            rx, ry = _rotate(sx, sy, width, height, EDGE_ANGLE)
-            x1 = x0 + rx
-            y1 = y0 + ry
-            edge_trace['x'].extend([x0, x1, None])
-            edge_trace['y'].extend([y0, y1, None])
+    return graph, removed_nodes, removed_edges, added_nodes, added_edges, nodes, edges
+
+
+def _apply_graph(g, diff):
+    graph, removed_nodes, removed_edges, added_nodes, added_edges, nodes, edges = diff
+    _apply_attrs(g.graph, graph)
+    g.remove_edges_from(removed_edges)
+    g.remove_nodes_from(removed_nodes)
+    g.add_nodes_from(added_nodes)
+    g.add_edges_from(added_edges)
+    for n, delta in nodes.items():
+        _apply_attrs(g.nodes[n], delta)
+    for (n, m), delta in edges.items():
+        _apply_attrs(g.edges[n, m], delta)
+
+
+def _default(value):
+    from plotly.utils import PlotlyJSONEncoder
+
+    return PlotlyJSONEncoder().default(value)
+
+
+def _dumps(value):
+    # orjson is optional, but much faster than the plotly encoder
+    if orjson is None:
+        from plotly.utils import PlotlyJSONEncoder
+
+        return json.dumps(value, cls=PlotlyJSONEncoder)
+    return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _pack(values):
+    # None is converted to NaN, which plotly also renders as a gap
+    try:
+        array = np.array(values, dtype='<f8')
+    except (TypeError, ValueError):
+        return values
+    if array.ndim != 1:
+        return values
+    return {'dtype': 'f8', 'bdata': b64encode(array.tobytes()).decode()}
+
+
+def _pack_trace(trace):
+    trace = dict(trace)
+    trace['x'] = _pack(trace['x'])
+    trace['y'] = _pack(trace['y'])
+    return trace
+
+
+_cache_stats = {'hits': 0, 'misses': 0}
+
+# total size of each cache directory, scanned on the first write and then kept by the writes
+_cache_sizes = {}
+
+
+def _update_digest(digest, *values):
+    digest.update(repr(values).encode())
+
+
+def _select(attrs, keys):
+    # a missing attribute is not the same as an attribute with value None
+    return [(key, attrs[key]) for key in keys if key in attrs]
+
+
+def _update_graph_digest(digest, g, edges):
+    _update_digest(digest, isinstance(g, nx.DiGraph), _select(g.graph, GRAPH_ATTRIBUTES))
+    _update_digest(digest, [(n, _select(attrs, NODE_ATTRIBUTES)) for n, attrs in g.nodes(data=True)])
+    _update_digest(digest, [(n, m, _select(g.adj[n][m], EDGE_ATTRIBUTES)) for n, m in edges])
+
+
+def _build_digest(*values):
+    digest = sha1()
+    # entries rendered by another version of the code are never served
+    _update_digest(digest, CACHE_FORMAT, PLOTLY_URL)
+    # the defaults can be changed by the user, so they are part of the content
+    _update_digest(digest, graph_width, graph_height, graph_bottom, graph_left, graph_right, graph_top, graph_awidth, graph_acolor)
+    _update_digest(digest, node_size, node_style, node_color, node_bwidth, node_bcolor, node_labpos)
+    _update_digest(digest, edge_width, edge_style, edge_color, edge_labflip, edge_labdist, edge_labfrac)
+    _update_digest(digest, *values)
+    return digest
+
+
+def _cache_entries():
+    entries = []
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            if CACHE_PATTERN.fullmatch(name):
+                path = os.path.join(CACHE_DIR, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+    return entries
+
+
+def _cache_lookup(digest, extension):
+    path = os.path.join(CACHE_DIR, '{}.{}'.format(digest.hexdigest(), extension))
+    if os.path.exists(path):
+        _cache_stats['hits'] += 1
+        # the modification time is the recency of the least recently used eviction
+        os.utime(path)
+        return path, True
+    _cache_stats['misses'] += 1
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return path, False
+
+
+def _cache_evict():
+    entries = _cache_entries()
+    size = sum(entry[1] for entry in entries)
+    for _, entry_size, path in sorted(entries):
+        if size <= CACHE_LIMIT:
+            break
+        os.remove(path)
+        size -= entry_size
+    _cache_sizes[CACHE_DIR] = size
+
+
+def _cache_read(path):
+    with open(path, encoding='utf-8') as file:
+        return file.read()
+
+
+def _cache_add(path, previous=0):
+    # the directory is only listed when its size is unknown or above the limit
+    size = _cache_sizes.get(CACHE_DIR)
+    if size is not None:
+        size += os.path.getsize(path) - previous
+        _cache_sizes[CACHE_DIR] = size
+    if size is None or size > CACHE_LIMIT:
+        _cache_evict()
+
+
+def _cache_write(path, text):
+    # the file is replaced atomically, so a concurrent lookup never reads it partially
+    temp = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp, 'w', encoding='utf-8') as file:
+        file.write(text)
+    previous = os.path.getsize(path) if os.path.exists(path) else 0
+    os.replace(temp, path)
+    _cache_add(path, previous)
+
+
+class _Figure:
+    def __init__(self, text, config):
+        self.text = text
+        self.config = config
+
+    def _repr_mimebundle_(self, include=None, exclude=None):
+        # JupyterLab, VS Code and nteract render the plotly mimetype natively, the html loads plotly by itself elsewhere
+        figure = json.loads(self.text) if orjson is None else orjson.loads(self.text)
+        figure['config'] = self.config
+        return {
+            'application/vnd.plotly.v1+json': figure,
+            'text/html': _format_html(FIGURE_HTML, uuid4(), self.text, self.config, True),
+        }
+
+
+def _show(text, config):
+    from IPython.display import display
+
+    display(_Figure(text, config))
+
+
+def _measure(value):
+    return len(_dumps(value))
+
+
+def _write_figure(stream, frames, layout, format):
+    first = next(frames)
+
+    if format == 'html':
+        stream.write(HTML_HEAD.encode())
+    stream.write('{{"data": {}, "layout": {}, "frames": [{}'.format(_dumps(first['data']), _dumps(layout), _dumps(first)).encode())
+    for frame in frames:
+        stream.write(', {}'.format(_dumps(frame)).encode())
+    stream.write(']}'.encode())
+    if format == 'html':
+        stream.write(HTML_TAIL.encode())
+
+
+def _build_frame_edge_keys(g, h, edges):
+    gedges = [(n, m) for n, m in edges if g.has_edge(n, m)]
+    hedges = [(n, m) for n, m in edges if not g.has_edge(n, m)]
+    keys = dict(zip(gedges, _build_edge_keys(g, gedges)))
+    keys.update(zip(hedges, _build_edge_keys(h, hedges)))
+    return keys
+
+
+def _build_frame_trace_keys(g, h):
+    edges = _build_edges(h)
+    keys = _build_frame_edge_keys(g, h, edges)
+    trace_keys = {}
+    for n, m in edges:
+        _, _, width, style, color, _, _, _ = keys[n, m]
+        if not g.has_edge(n, m):
+            color = (255, 255, 255, 0)
+        trace_keys[width, style, color] = None
+    return trace_keys
+
+
+def _build_frame(g, h, compact, local_width, local_height, bounds, origin):
+    bottom, left, right, top, awidth, acolor = _build_graph_key(g)
+    local_width += left + right
+    local_height += bottom + top
+    graph_trace = _build_graph_trace(g, origin, awidth, acolor)
+
+    gpos = _build_graph_pos(g, bounds)
+    hpos = _build_graph_pos(h, bounds)
+
+    node_traces = []
+    node_label_trace = _build_node_label_trace(local_width, local_height, bottom, left, right, top)
+    node_extra_traces = []
+    if compact:
+        node_points_trace = _build_node_points_trace()
+        node_extra_points_trace = _build_node_extra_points_trace()
+        node_traces.append(node_points_trace)
+        node_extra_traces.append(node_extra_points_trace)
+    gnodes = [n for n in h.nodes if g.has_node(n)]
+    hnodes = [n for n in h.nodes if not g.has_node(n)]
+    keys = dict(zip(gnodes, _build_node_keys(g, gnodes)))
+    keys.update(zip(hnodes, _build_node_keys(h, hnodes)))
+    for n in h.nodes:
+        if g.has_node(n):
+            size, style, color, bwidth, bcolor, labpos = keys[n]
+            node_trace = _build_node_trace(size, style, color, bwidth, bcolor, labpos, False)
+            node_extra_trace = _build_node_extra_trace((255, 255, 255) if is_dark(color) else (0, 0, 0))
+            source, pos = g, gpos
+        else:
+            size, style, _, bwidth, _, labpos = keys[n]
+            node_trace = _build_node_trace(size, style, (255, 255, 255, 0), bwidth, (255, 255, 255, 0), labpos, True)
+            node_extra_trace = _build_node_extra_trace((255, 255, 255, 0))
+            source, pos = h, hpos
+        if compact:
+            _add_node(source, n, pos, node_points_trace, node_extra_points_trace, labpos)
+            _add_node_point(node_points_trace, node_extra_points_trace, node_trace, node_extra_trace)
+        else:
+            _add_node(source, n, pos, node_trace, node_extra_trace, labpos)
+            node_traces.append(node_trace)
+            node_extra_traces.append(node_extra_trace)
+
+    edge_traces = {} if compact else []
+    edge_label_trace = _build_edge_label_trace()
+    edges = _build_edges(h)
+    keys = _build_frame_edge_keys(g, h, edges)
+    gedges = [(n, m) for n, m in edges if g.has_edge(n, m)]
+    hedges = [(n, m) for n, m in edges if not g.has_edge(n, m)]
+    directed = isinstance(h, nx.DiGraph)
+    if directed:
+        reciprocal = dict(zip(gedges, _build_reciprocal(g, gedges)))
+        reciprocal.update(zip(hedges, _build_reciprocal(h, hedges)))
+    coords = []
+    labels = []
+    traces = []
+    for n, m in edges:
+        if g.has_edge(n, m):
+            _, _, width, style, color, _, _, _ = keys[n, m]
+            coords.append(gpos[n] + gpos[m])
+            labels.append(get_edge_label(g, n, m))
+        else:
+            _, _, width, style, _, _, _, _ = keys[n, m]
+            color = (255, 255, 255, 0)
+            coords.append(hpos[n] + hpos[m])
+            labels.append(get_edge_label(h, n, m))
+        if compact:
+            key = (width, style, color)
+            if key not in edge_traces:
+                edge_traces[key] = _build_edge_trace(width, style, color)
+            traces.append(edge_traces[key])
+        else:
+            traces.append(_build_edge_trace(width, style, color))
+            edge_traces.append(traces[-1])
+    _add_edges(coords, labels, [keys[e] for e in edges], directed, [directed and reciprocal[e] for e in edges], traces, edge_label_trace, local_width, local_height)
+
+    data = [graph_trace]
+    data.extend(node_traces)
+    data.extend(node_extra_traces)
+    data.append(edge_label_trace)
+    data.append(node_label_trace)
+
+    frame = {
+        'data': data,
+    }
+
+    # the edge traces are inserted by play, because compact frames must agree on them
+    return frame, edge_traces
+
+
+def _unwrap(g):
+    return getattr(g, '__wrapped__', g)
+
+
+def _build_snapshot(g, h):
+    edges = [(n, m) for n, m in h.edges if not g.has_edge(n, m)]
+    nodes = {n for n in h.nodes if not g.has_node(n)}
+    for n, m in edges:
+        nodes.add(n)
+        nodes.add(m)
+
+    return {n: dict(h.nodes[n]) for n in nodes}, {(n, m): dict(h.edges[n, m]) for n, m in edges}
+
+
+def _build_frame_shared(shared, task):
+    g, snapshot = task
+    h, compact, local_width, local_height, bounds, origin = shared
+
+    if h is None:
+        return _build_frame(g, g, compact, local_width, local_height, bounds, origin)
+
+    # the snapshot covers every attribute of h that the frame reads
+    nodes, edges = snapshot
+    for n, attrs in nodes.items():
+        h.nodes[n].clear()
+        h.nodes[n].update(attrs)
+    for (n, m), attrs in edges.items():
+        h.edges[n, m].clear()
+        h.edges[n, m].update(attrs)
+
+    return _build_frame(g, h, compact, local_width, local_height, bounds, origin)
+
+
+def _build_backend(g, toolbar, backend, compact, name):
+    if not isinstance(toolbar, bool):
+        raise TypeError('{} toolbar must be a boolean'.format(name))
+
+    if not isinstance(compact, bool):
+        raise TypeError('{} compact must be a boolean'.format(name))
+
+    if backend is None:
+        if g.number_of_nodes() + g.number_of_edges() > WEBGL_THRESHOLD:
+            return 'webgl'
+        return 'svg'
+
+    if not isinstance(backend, str):
+        raise TypeError('{} backend must be a string'.format(name))
+    if backend not in BACKENDS:
+        raise KeyError('{} backend must be one of the following: '.format(name) + ', '.join('\'{}\''.format(b) for b in BACKENDS))
+
+    return backend
+
+
+def _build_draw_figure(g, edges, backend, compact, typed):
+    local_width = _build_graph_width(g)
+    local_height = _build_graph_height(g)
+
+    bounds, origin = _build_graph_plane(g)
+
+    bottom, left, right, top, awidth, acolor = _build_graph_key(g)
+    local_width += left + right
+    local_height += bottom + top
+    graph_trace = _build_graph_trace(g, origin, awidth, acolor)
+
+    pos = _build_graph_pos(g, bounds)
+
+    node_traces = {}
+    node_label_trace = _build_node_label_trace(local_width, local_height, bottom, left, right, top)
+    node_black_trace = _build_node_extra_trace((0, 0, 0))
+    node_white_trace = _build_node_extra_trace((255, 255, 255))
+    compact = compact or backend == 'webgl'
+    node_points_trace = _build_node_points_trace()
+    node_extra_points_trace = _build_node_extra_points_trace()
+    keys = _build_node_keys(g, g.nodes)
+    darks = are_dark([color for _, _, color, _, _, _ in keys])
+    for n, key, dark in zip(g.nodes, keys, darks):
+        size, style, color, bwidth, bcolor, labpos = key
+        if key not in node_traces:
+            node_traces[key] = _build_node_trace(size, style, color, bwidth, bcolor, labpos, False)
+        node_extra_trace = node_white_trace if dark else node_black_trace
+        if compact:
+            _add_node(g, n, pos, node_points_trace, node_extra_points_trace, labpos)
+            _add_node_point(node_points_trace, node_extra_points_trace, node_traces[key], node_extra_trace)
+        else:
+            _add_node(g, n, pos, node_traces[key], node_extra_trace, labpos)
+
+    edge_traces = {}
+    edge_label_trace = _build_edge_label_trace()
+    keys = _build_edge_keys(g, edges)
+    traces = []
+    for _, _, width, style, color, _, _, _ in keys:
+        key = (width, style, color)
+        if key not in edge_traces:
+            edge_traces[key] = _build_edge_trace(width, style, color)
+        traces.append(edge_traces[key])
+    coords = [pos[n] + pos[m] for n, m in edges]
+    labels = [get_edge_label(g, n, m) for n, m in edges]
+    directed = isinstance(g, nx.DiGraph)
+    if directed:
+        reciprocal = _build_reciprocal(g, edges)
+    else:
+        reciprocal = [False] * len(edges)
+    _add_edges(coords, labels, keys, directed, reciprocal, traces, edge_label_trace, local_width, local_height)
+
+    data = [graph_trace]
+    data.extend(edge_traces.values())
+    if compact:
+        data.append(node_points_trace)
+        data.append(node_extra_points_trace)
+    else:
+        data.extend(node_traces.values())
+        data.append(node_white_trace)
+        data.append(node_black_trace)
+    data.append(edge_label_trace)
+    data.append(node_label_trace)
+
+    if backend == 'webgl':
+        for trace in data:
+            trace['type'] = 'scattergl'
+
+    if typed:
+        data = [_pack_trace(trace) for trace in data]
+
+    layout = _build_layout(local_width, local_height)
+    if isinstance(g, nx.DiGraph):
+        layout['xaxis']['fixedrange'] = True
+        layout['yaxis']['fixedrange'] = True
+
+    return {
+        'data': data,
+        'layout': layout,
+    }
+
+
+def _render(g, backend, compact, typed, cache):
+    edges = _build_edges(g)
+
+    if not cache:
+        return _dumps(_build_draw_figure(g, edges, backend, compact, typed))
+
+    digest = _build_digest('figure', backend, compact, typed)
+    _update_graph_digest(digest, g, edges)
+
+    path, hit = _cache_lookup(digest, 'json')
+    if hit:
+        return _cache_read(path)
+
+    text = _dumps(_build_draw_figure(g, edges, backend, compact, typed))
+    _cache_write(path, text)
+    return text
 
 
 def get_node_label(g, n):
@@ -681,6 +1456,42 @@ def get_edge_label(g, n, m):
     return label
 
 
+def cache_info():
+    '''Report the usage of the render cache.
+
+    The figures rendered by :func:`draw <freeman.drawing.draw>`, :func:`interact
+    <freeman.drawing.interact>`, :func:`render_html <freeman.drawing.render_html>`,
+    and :func:`Animation.play <freeman.drawing.Animation.play>` are stored in
+    ``CACHE_DIR``, under a hash of the graph topology, the node positions, and
+    the :ref:`visual attributes <visual-attributes>`. Rendering an unchanged
+    graph again reuses the stored figure. When the stored figures exceed
+    ``CACHE_LIMIT`` bytes, the least recently used are removed.
+
+    :rtype: dict
+    :return: A dictionary with the numbers of ``'hits'`` and ``'misses'`` since
+             the module was imported or the cache was cleared, and the number of
+             stored ``'files'`` and their total ``'size'``, in bytes.
+    '''
+    entries = _cache_entries()
+
+    return {
+        'hits': _cache_stats['hits'],
+        'misses': _cache_stats['misses'],
+        'files': len(entries),
+        'size': sum(entry[1] for entry in entries),
+    }
+
+
+def cache_clear():
+    '''Remove all figures from the render cache and reset its counters.'''
+    for _, _, path in _cache_entries():
+        os.remove(path)
+    _cache_sizes[CACHE_DIR] = 0
+
+    _cache_stats['hits'] = 0
+    _cache_stats['misses'] = 0
+
+
 def interact(g, physics=False, path=None):
     '''Render an interactive visualization of a graph.
 
@@ -710,18 +1521,63 @@ def interact(g, physics=False, path=None):
 
     :type path: str
     :param path: Path of the HTML file. If ``None``, the visualization is saved to
-                 ``'__fmcache__/<id>.html'``, where ``<id>`` is the `identity
-                 <https://docs.python.org/3/library/functions.html#id>`_ of the graph.
+                 ``'__fmcache__/<hash>.html'``, where ``<hash>`` is the hash of the graph
+                 in the :func:`render cache <freeman.drawing.cache_info>`, and an existing
+                 file is reused.
     '''
+    from IPython.display import display, IFrame
+
     if not isinstance(physics, bool):
         raise TypeError('interact physics must be a boolean')
 
+    edges = _build_edges(g)
+
+    cached = path is None
+    if cached:
+        digest = _build_digest('network', physics)
+        _update_graph_digest(digest, g, edges)
+
+        path, hit = _cache_lookup(digest, 'html')
+    else:
+        if not isinstance(path, str):
+            raise TypeError('interact path must be a string')
+        if not path.endswith('.html'):
+            raise ValueError('interact path must end with .html')
+        if os.path.exists(path):
+            access = os.access(path, os.W_OK)
+        else:
+            access = os.access(os.path.dirname(os.path.abspath(path)), os.W_OK)
+        if not access:
+            raise ValueError('interact path must have write permission')
+
+        hit = False
+
     local_width = _build_graph_width(g)
     local_height = _build_graph_height(g)
 
+    bottom, left, right, top, _, _ = _build_graph_key(g)
+    dx = left + right
+    dy = bottom + top
+
+    if hit:
+        iframe = IFrame(path, width=local_width + dx, height=local_height + dy)
+    else:
+        iframe = _build_network(g, edges, physics, path, local_width, local_height, bottom, left, right, top)
+        if cached:
+            _cache_add(path)
+
+    # parameters estimated from screenshots
+    iframe.width += 10
+    iframe.height += 10
+
+    display(iframe)
+
+
+def _build_network(g, edges, physics, path, local_width, local_height, bottom, left, right, top):
+    from pyvis.network import Network
+
     bounds, _ = _build_graph_plane(g)
 
-    bottom, left, right, top, _, _ = _build_graph_key(g)
     dx = left + right
     dy = bottom + top
     network = Network(
@@ -738,11 +1594,10 @@ def interact(g, physics=False, path=None):
 
     dx = left - dx // 2
     dy = top - dy // 2
-    for n in g.nodes:
+    for n, (size, style, color, bwidth, bcolor, _) in zip(g.nodes, _build_node_keys(g, g.nodes)):
         x, y = pos[n]
-        size, style, color, bwidth, bcolor, _ = _build_node_key(g, n)
-        color = _convert(color)
-        bcolor = _convert(bcolor)
+        color = format_color(color)
+        bcolor = format_color(bcolor)
         options = {
             'borderWidth': bwidth,
             'borderWidthSelected': 1,
@@ -772,59 +1627,34 @@ def interact(g, physics=False, path=None):
             options['title'] = label
         network.add_node(n, **options)
 
-    for n, m in g.edges:
-        if n == m:
-            warn('self loops are not supported, ignoring')
-        else:
-            _, _, width, style, color, _, _, _ = _build_edge_key(g, n, m)
-            color = _convert(color)
-            options = {
-                'color': {
-                    'color': color,
-                    'highlight': color,
-                    'hover': color,
+    for (n, m), (_, _, width, style, color, _, _, _) in zip(edges, _build_edge_keys(g, edges)):
+        color = format_color(color)
+        options = {
+            'color': {
+                'color': color,
+                'highlight': color,
+                'hover': color,
+            },
+            'dashes': EDGE_STYLES[style],
+            'labelHighlightBold': False,
+            'selectionWidth': 0,
+            'width': width,
+        }
+        label = get_edge_label(g, n, m)
+        if label:
+            options['title'] = label
+        network.add_edge(n, m, **options)
+        if network.directed:
+            network.edges[-1]['arrows'] = {
+                'to': {
+                    'scaleFactor': EDGE_SCALE,
                 },
-                'dashes': EDGE_STYLES[style],
-                'labelHighlightBold': False,
-                'selectionWidth': 0,
-                'width': width,
             }
-            label = get_edge_label(g, n, m)
-            if label:
-                options['title'] = label
-            network.add_edge(n, m, **options)
-            if network.directed:
-                network.edges[-1]['arrows'] = {
-                    'to': {
-                        'scaleFactor': EDGE_SCALE,
-                    },
-                }
-
-    if path is None:
-        if not os.path.exists(CACHE_DIR):
-            os.mkdir(CACHE_DIR)
-        path = os.path.join(CACHE_DIR, '{}.html'.format(id(g)))
-    else:
-        if not isinstance(path, str):
-            raise TypeError('interact path must be a string')
-        if not path.endswith('.html'):
-            raise ValueError('interact path must end with .html')
-        if os.path.exists(path):
-            access = os.access(path, os.W_OK)
-        else:
-            access = os.access(os.path.dirname(os.path.abspath(path)), os.W_OK)
-        if not access:
-            raise ValueError('interact path must have write permission')
-
-    iframe = network.show(path)
-    # parameters estimated from screenshots
-    iframe.width += 10
-    iframe.height += 10
 
-    display(iframe)
+    return network.show(path)
 
 
-def draw(g, toolbar=False):
+def draw(g, toolbar=False, backend=None, compact=False):
     '''Render a static visualization of a graph.
 
     The visualization is powered by `Plotly <https://plot.ly/python/>`_, based
@@ -835,71 +1665,121 @@ def draw(g, toolbar=False):
     **(m, n)** in a directed graph is rendered as two separate edges in opposite
     directions. Such rendering is more faithful to the graph density.
 
+    The figure is serialized straight to JSON and stored in the :func:`render
+    cache <freeman.drawing.cache_info>`, so drawing an unchanged graph again
+    does not build it again.
+
     :type g: NetworkX Graph or DiGraph
     :param g: The graph to visualize.
 
     :type toolbar: bool
     :param toolbar: Whether to enable the toolbar. This is particularly useful for saving the
                     visualization to a PNG file.
+
+    :type backend: str
+    :param backend: Either ``'svg'`` or ``'webgl'``. The latter renders large graphs much faster
+                    and implies ``compact=True``. If ``None``, ``'webgl'`` is used when the graph
+                    has more than ``WEBGL_THRESHOLD`` nodes and edges combined.
+
+    :type compact: bool
+    :param compact: Whether to render all nodes in a single trace, with per-node marker arrays.
+                    Edges are still grouped by width, style, and color. This makes the figure
+                    much smaller for graphs with many distinct node attributes.
     '''
-    if not isinstance(toolbar, bool):
-        raise TypeError('draw toolbar must be a boolean')
+    backend = _build_backend(g, toolbar, backend, compact, 'draw')
 
-    local_width = _build_graph_width(g)
-    local_height = _build_graph_height(g)
+    _show(_render(g, backend, compact, False, True), {'displayModeBar': toolbar})
 
-    bounds, origin = _build_graph_plane(g)
 
-    bottom, left, right, top, awidth, acolor = _build_graph_key(g)
-    local_width += left + right
-    local_height += bottom + top
-    graph_trace = _build_graph_trace(g, origin, awidth, acolor)
+def _valid_path(path, extension, name):
+    if not isinstance(path, str):
+        raise TypeError('{} path must be a string'.format(name))
+    if not path.endswith(extension):
+        raise ValueError('{} path must end with {}'.format(name, extension))
+    if os.path.exists(path):
+        access = os.access(path, os.W_OK)
+    else:
+        access = os.access(os.path.dirname(os.path.abspath(path)), os.W_OK)
+    if not access:
+        raise ValueError('{} path must have write permission'.format(name))
 
-    pos = _build_graph_pos(g, bounds)
 
-    node_traces = {}
-    node_label_trace = _build_node_label_trace(local_width, local_height, bottom, left, right, top)
-    node_black_trace = _build_node_extra_trace((0, 0, 0))
-    node_white_trace = _build_node_extra_trace((255, 255, 255))
-    for n in g.nodes:
-        size, style, color, bwidth, bcolor, labpos = _build_node_key(g, n)
-        key = (size, style, color, bwidth, bcolor, labpos)
-        if key not in node_traces:
-            node_traces[key] = _build_node_trace(size, style, color, bwidth, bcolor, labpos, False)
-        node_extra_trace = node_white_trace if _toodark(color) else node_black_trace
-        _add_node(g, n, pos, node_traces[key], node_extra_trace, labpos)
+def render_html(g, path, toolbar=False, backend=None, compact=False, cache=True):
+    '''Render a static visualization of a graph to a standalone HTML file.
 
-    edge_traces = {}
-    edge_label_trace = _build_edge_label_trace()
-    for n, m in g.edges:
-        if n == m:
-            warn('self loops are not supported, ignoring')
-        else:
-            n_size, m_size, width, style, color, labflip, labdist, labfrac = _build_edge_key(g, n, m)
-            key = (width, style, color)
-            if key not in edge_traces:
-                edge_traces[key] = _build_edge_trace(width, style, color)
-            _add_edge(g, n, m, pos, edge_traces[key], edge_label_trace, local_width, local_height, n_size, m_size, labflip, labdist, labfrac)
+    The visualization is the same as the one rendered by the :func:`draw
+    <freeman.drawing.draw>` function, but it does not require Jupyter. The node
+    and edge coordinates are encoded as binary typed arrays, so the file is
+    smaller and loads faster, and the page loads a recent version of Plotly
+    from its CDN.
 
-    data = [graph_trace]
-    data.extend(edge_traces.values())
-    data.extend(node_traces.values())
-    data.append(node_white_trace)
-    data.append(node_black_trace)
-    data.append(edge_label_trace)
-    data.append(node_label_trace)
+    :type g: NetworkX Graph or DiGraph
+    :param g: The graph to visualize.
 
-    layout = _build_layout(local_width, local_height)
-    if isinstance(g, nx.DiGraph):
-        layout['xaxis']['fixedrange'] = True
-        layout['yaxis']['fixedrange'] = True
+    :type path: str
+    :param path: Path of the HTML file.
 
-    figure = {
-        'data': data,
-        'layout': layout,
-    }
+    :type toolbar: bool
+    :param toolbar: Whether to enable the toolbar.
+
+    :type backend: str
+    :param backend: Either ``'svg'`` or ``'webgl'``. See :func:`draw <freeman.drawing.draw>`.
+
+    :type compact: bool
+    :param compact: Whether to render all nodes in a single trace. See :func:`draw
+                    <freeman.drawing.draw>`.
+
+    :type cache: bool
+    :param cache: Whether to use the :func:`render cache <freeman.drawing.cache_info>`.
+                  Batch jobs that render each graph once are faster without it.
+    '''
+    _valid_path(path, '.html', 'render')
+
+    if not isinstance(cache, bool):
+        raise TypeError('render cache must be a boolean')
 
-    plotly.offline.iplot(figure, config={'displayModeBar': toolbar}, show_link=False)
+    backend = _build_backend(g, toolbar, backend, compact, 'render')
+
+    text = _render(g, backend, compact, True, cache)
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(_format_html(PAGE_HTML, 'figure', text, {'displayModeBar': toolbar}, False))
+
+
+def render_json(g, path, backend=None, compact=False, cache=True):
+    '''Render a static visualization of a graph to a JSON file.
+
+    The file is the Plotly figure of the visualization rendered by the
+    :func:`draw <freeman.drawing.draw>` function, which can be loaded by any
+    version of Plotly. It does not require Jupyter.
+
+    :type g: NetworkX Graph or DiGraph
+    :param g: The graph to visualize.
+
+    :type path: str
+    :param path: Path of the JSON file.
+
+    :type backend: str
+    :param backend: Either ``'svg'`` or ``'webgl'``. See :func:`draw <freeman.drawing.draw>`.
+
+    :type compact: bool
+    :param compact: Whether to render all nodes in a single trace. See :func:`draw
+                    <freeman.drawing.draw>`.
+
+    :type cache: bool
+    :param cache: Whether to use the :func:`render cache <freeman.drawing.cache_info>`.
+    '''
+    _valid_path(path, '.json', 'render')
+
+    if not isinstance(cache, bool):
+        raise TypeError('render cache must be a boolean')
+
+    backend = _build_backend(g, False, backend, compact, 'render')
+
+    text = _render(g, backend, compact, False, cache)
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text)
 
 
 class Animation:
@@ -918,8 +1798,28 @@ class Animation:
 
     :type height: int
     :param height: Animation height, in pixels. Must be positive.
+
+    :type compact: bool
+    :param compact: Whether to render all nodes of a frame in a single trace, with per-node
+                    marker arrays, and group edges by width, style, and color instead of
+                    rendering one trace per node and per edge.
+
+    :type delta: bool
+    :param delta: Whether to encode each frame as the trace properties that changed since the
+                  previous frame. The visual result is the same, but the figure is much
+                  smaller when only a few properties change between recs.
+
+    :type diff: bool
+    :param diff: Whether to record only the first graph and, for each subsequent rec, the
+                 nodes, edges, and attributes that changed since the previous rec. The
+                 recorded graphs are reconstructed one at a time when playing, so memory
+                 does not grow with the number of copies.
+
+    :type workers: int
+    :param workers: Number of processes for building frames. Must be positive. The frames
+                    are the same for any number of processes.
     '''
-    def __init__(self, width=None, height=None):
+    def __init__(self, width=None, height=None, compact=False, delta=False, diff=False, workers=1):
         if width is not None:
             if not isinstance(width, int):
                 raise TypeError('animation width must be an integer')
@@ -932,9 +1832,32 @@ class Animation:
             if height <= 0:
                 raise ValueError('animation height must be positive')
 
+        if not isinstance(compact, bool):
+            raise TypeError('animation compact must be a boolean')
+
+        if not isinstance(delta, bool):
+            raise TypeError('animation delta must be a boolean')
+
+        if not isinstance(diff, bool):
+            raise TypeError('animation diff must be a boolean')
+
+        if not isinstance(workers, int):
+            raise TypeError('animation workers must be an integer')
+        if workers <= 0:
+            raise ValueError('animation workers must be positive')
+
         self.width = width
         self.height = height
+        self.compact = compact
+        self.delta = delta
+        self.diff = diff
+        self.workers = workers
         self.graphs = []
+        self.shapes = []
+        self.limits = None
+        self.current = None
+        self.union = None
+        self.digest = _build_digest('animation')
 
     def __enter__(self):
         return self
@@ -942,100 +1865,70 @@ class Animation:
     def __exit__(self, type, value, traceback):
         self.play()
 
-    def _render(self, g, h, local_width, local_height, bounds, origin):
-        bottom, left, right, top, awidth, acolor = _build_graph_key(g)
-        local_width += left + right
-        local_height += bottom + top
-        graph_trace = _build_graph_trace(g, origin, awidth, acolor)
-
-        gpos = _build_graph_pos(g, bounds)
-        hpos = _build_graph_pos(h, bounds)
-
-        node_traces = []
-        node_label_trace = _build_node_label_trace(local_width, local_height, bottom, left, right, top)
-        node_extra_traces = []
-        for n in h.nodes:
-            if g.has_node(n):
-                size, style, color, bwidth, bcolor, labpos = _build_node_key(g, n)
-                node_trace = _build_node_trace(size, style, color, bwidth, bcolor, labpos, False)
-                node_extra_trace = _build_node_extra_trace((255, 255, 255) if _toodark(color) else (0, 0, 0))
-                _add_node(g, n, gpos, node_trace, node_extra_trace, labpos)
-            else:
-                size, style, _, bwidth, _, labpos = _build_node_key(h, n)
-                node_trace = _build_node_trace(size, style, (255, 255, 255, 0), bwidth, (255, 255, 255, 0), labpos, True)
-                node_extra_trace = _build_node_extra_trace((255, 255, 255, 0))
-                _add_node(h, n, hpos, node_trace, node_extra_trace, labpos)
-            node_traces.append(node_trace)
-            node_extra_traces.append(node_extra_trace)
-
-        edge_traces = []
-        edge_label_trace = _build_edge_label_trace()
-        for n, m in h.edges:
-            if n == m:
-                warn('self loops are not supported, ignoring')
-            else:
-                if g.has_edge(n, m):
-                    n_size, m_size, width, style, color, labflip, labdist, labfrac = _build_edge_key(g, n, m)
-                    edge_trace = _build_edge_trace(width, style, color)
-                    _add_edge(g, n, m, gpos, edge_trace, edge_label_trace, local_width, local_height, n_size, m_size, labflip, labdist, labfrac)
-                else:
-                    n_size, m_size, width, style, _, labflip, labdist, labfrac = _build_edge_key(h, n, m)
-                    edge_trace = _build_edge_trace(width, style, (255, 255, 255, 0))
-                    _add_edge(h, n, m, hpos, edge_trace, edge_label_trace, local_width, local_height, n_size, m_size, labflip, labdist, labfrac)
-                edge_traces.append(edge_trace)
-
-        data = [graph_trace]
-        data.extend(edge_traces)
-        data.extend(node_traces)
-        data.extend(node_extra_traces)
-        data.append(edge_label_trace)
-        data.append(node_label_trace)
-
-        frame = {
-            'data': data,
-        }
-
-        return frame
-
     def rec(self, g):
         '''Record a graph.
 
         The method simply stores a copy of the graph. The original graph is not
-        stored because it is expected to change after being recorded.
+        stored because it is expected to change after being recorded. If the
+        animation constructor has been called with ``diff=True``, only the
+        changes since the previous rec are stored.
 
         :type g: NetworkX Graph or DiGraph
         :param g: The graph to record.
         '''
-        self.graphs.append(g.copy())
-
-    def play(self):
-        '''Play recorded graphs.
-
-        If the animation constructor has been called with ``width=None``, checks
-        if all recorded graphs have the same width. If they do, such width is
-        used for displaying the animation. Otherwise, the default value for
-        graph width is used. Same for ``height=None``.
+        self.limits = _merge_graph_limits(self.limits, _build_graph_limits(g))
+        _update_graph_digest(self.digest, g, g.edges)
+        self.shapes.append((_build_graph_fingerprint(g), _build_graph_width(g), _build_graph_height(g)))
+
+        if not self.diff:
+            self.graphs.append(g.copy())
+            return
+
+        if self.current is None:
+            self.graphs.append(g.copy())
+            self.current = g.copy()
+            self.union = g.copy()
+            return
+
+        diff = _diff_graph(self.current, g)
+        _apply_graph(self.current, diff)
+        # a diff cannot reorder nodes or edges, so a reordered graph is stored in full
+        if list(self.current.nodes) == list(g.nodes) and list(self.current.edges) == list(g.edges):
+            self.graphs.append(diff)
+        else:
+            self.graphs.append(g.copy())
+            self.current = g.copy()
+
+        self.union.graph.update(g.graph)
+        self.union.add_nodes_from(g.nodes(data=True))
+        self.union.add_edges_from(g.edges(data=True))
+
+    def _replay(self):
+        if not self.diff:
+            yield from self.graphs
+            return
+
+        g = None
+        for recorded in self.graphs:
+            if isinstance(recorded, nx.Graph):
+                g = recorded.copy()
+            else:
+                g = g.copy()
+                _apply_graph(g, recorded)
+            yield g
 
-        At least two graphs must have been recorded.
-        '''
-        if len(self.graphs) < 2:
+    def _build_size(self):
+        if len(self.shapes) < 2:
             raise ValueError('animation must have at least two recs')
 
-        h = None
         width = self.width
         height = self.height
-        last = self.graphs[-1]
-        number_of_nodes = last.number_of_nodes()
-        number_of_edges = last.number_of_edges()
-        local_width = _build_graph_width(last)
-        local_height = _build_graph_height(last)
-
-        for g in self.graphs[:-1]:
-            if h is None and (g.number_of_nodes() != number_of_nodes or g.number_of_edges() != number_of_edges):
-                h = nx.compose_all(self.graphs)
-            if width is None and _build_graph_width(g) != local_width:
+        _, local_width, local_height = self.shapes[-1]
+
+        for shape in self.shapes[:-1]:
+            if width is None and shape[1] != local_width:
                 width = graph_width
-            if height is None and _build_graph_height(g) != local_height:
+            if height is None and shape[2] != local_height:
                 height = graph_height
 
         if width is None:
@@ -1043,29 +1936,74 @@ class Animation:
         if height is None:
             height = local_height
 
-        union = nx.disjoint_union_all(self.graphs)
-        bounds, origin = _build_graph_plane(union)
+        return width, height
+
+    def _build_union(self):
+        fingerprint, _, _ = self.shapes[-1]
+
+        for shape in self.shapes[:-1]:
+            if shape[0] != fingerprint:
+                if self.diff:
+                    return self.union.copy()
+                return nx.compose_all(self.graphs)
 
-        frames = []
-        for i, g in enumerate(self.graphs):
+        return None
+
+    def _build_tasks(self, h):
+        graphs = self._replay()
+        g = next(graphs)
+        for _ in self.shapes:
+            following = next(graphs, None)
             if h is None:
-                frames.append(self._render(g, g, width, height, bounds, origin))
+                yield _unwrap(g), None
+            else:
+                if following is not None:
+                    for n in following.nodes:
+                        h.nodes[n].update(following.nodes[n])
+                    for n, m in following.edges:
+                        h.edges[n, m].update(following.edges[n, m])
+                yield _unwrap(g), _build_snapshot(g, h)
+            g = following
+
+    def _render_all(self, width, height):
+        h = self._build_union()
+
+        bounds, origin = _build_graph_bounds(self.limits)
+
+        # each task is a graph and the attributes of h it needs, so frames can be built in any process
+        shared = (None if h is None else _unwrap(h).copy(), self.compact, width, height, bounds, origin)
+
+        return _imap(_build_frame_shared, self._build_tasks(h), self.workers, shared)
+
+    def _build_frames(self, width, height, delta):
+        # compact frames must agree on the edge traces, so their keys are collected first,
+        # from the edge attributes alone, since rendering every frame twice would double the cost
+        if self.compact:
+            keys = {}
+            h = self._build_union()
+            for g, _ in self._build_tasks(h):
+                keys.update(_build_frame_trace_keys(g, g if h is None else h))
+
+        previous = None
+        for i, (frame, edge_traces) in enumerate(self._render_all(width, height)):
+            if self.compact:
+                frame['data'][1:1] = [edge_traces[key] if key in edge_traces else _build_edge_trace(*key) for key in keys]
+            else:
+                frame['data'][1:1] = edge_traces
+            frame['name'] = i
+            if delta and previous is not None:
+                yield _encode_frame(previous, frame)
             else:
-                if g != last:
-                    next = self.graphs[i + 1]
-                    for n in next.nodes:
-                        h.nodes[n].update(next.nodes[n])
-                    for n, m in next.edges:
-                        h.edges[n, m].update(next.edges[n, m])
-                frames.append(self._render(g, h, width, height, bounds, origin))
+                yield frame
+            previous = frame
 
+    def _build_layout(self, width, height):
         # parameters estimated from screenshots
         width = 1.05 * width + 72
         height = 1.00 * height + 76
 
         steps = []
-        for i, frame in enumerate(frames):
-            frame['name'] = i
+        for i in range(len(self.shapes)):
             step = {
                 'args': [[i], {'frame': {'redraw': False}, 'mode': 'immediate'}],
                 'label': '',
@@ -1103,13 +2041,140 @@ class Animation:
             ],
         })
 
+        return layout
+
+    def _build_figure(self):
+        width, height = self._build_size()
+
+        frames = list(self._build_frames(width, height, self.delta))
+
         figure = {
             'data': frames[0]['data'],
-            'layout': layout,
+            'layout': self._build_layout(width, height),
             'frames': frames,
         }
 
-        plotly.offline.iplot(figure, config={'displayModeBar': False}, show_link=False)
+        return figure
+
+    def play(self):
+        '''Play recorded graphs.
+
+        If the animation constructor has been called with ``width=None``, checks
+        if all recorded graphs have the same width. If they do, such width is
+        used for displaying the animation. Otherwise, the default value for
+        graph width is used. Same for ``height=None``.
+
+        The figure is serialized straight to JSON and stored in the :func:`render
+        cache <freeman.drawing.cache_info>`, so playing the same recs again does
+        not build it again.
 
+        At least two graphs must have been recorded.
+        '''
+        width, height = self._build_size()
+
+        digest = self.digest.copy()
+        _update_digest(digest, width, height, self.compact, self.delta)
+
+        path, hit = _cache_lookup(digest, 'json')
+        if hit:
+            text = _cache_read(path)
+        else:
+            text = _dumps(self._build_figure())
+            _cache_write(path, text)
+
+        _show(text, {'displayModeBar': False})
+
+    def save(self, path, format='json', gzip=False):
+        '''Save recorded graphs.
+
+        The figure displayed by :func:`play <freeman.drawing.Animation.play>` is
+        written one frame at a time, so memory use is bounded by a couple of
+        frames instead of the whole animation. The JSON format is the figure
+        itself, while the HTML format is a standalone page that loads Plotly
+        from its CDN.
+
+        At least two graphs must have been recorded.
+
+        :type path: str or file
+        :param path: Path of the file or a binary file object.
+
+        :type format: str
+        :param format: Either ``'json'`` or ``'html'``.
+
+        :type gzip: bool
+        :param gzip: Whether to compress the output with gzip.
+        '''
+        if not isinstance(format, str):
+            raise TypeError('animation format must be a string')
+        if format not in SAVE_FORMATS:
+            raise KeyError('animation format must be one of the following: ' + ', '.join('\'{}\''.format(f) for f in SAVE_FORMATS))
 
-plotly.offline.init_notebook_mode(connected=True)
+        if not isinstance(gzip, bool):
+            raise TypeError('animation gzip must be a boolean')
+
+        if isinstance(path, str):
+            if os.path.exists(path):
+                access = os.access(path, os.W_OK)
+            else:
+                access = os.access(os.path.dirname(os.path.abspath(path)), os.W_OK)
+            if not access:
+                raise ValueError('animation path must have write permission')
+        else:
+            if not hasattr(path, 'write'):
+                raise TypeError('animation path must be a string or a file object')
+
+        width, height = self._build_size()
+        frames = self._build_frames(width, height, self.delta)
+        layout = self._build_layout(width, height)
+
+        if isinstance(path, str):
+            file = open(path, 'wb')
+        else:
+            file = path
+        try:
+            if gzip:
+                stream = GzipFile(fileobj=file, mode='wb')
+            else:
+                stream = file
+            try:
+                _write_figure(stream, frames, layout, format)
+            finally:
+                if gzip:
+                    stream.close()
+        finally:
+            if isinstance(path, str):
+                file.close()
+
+    def report(self):
+        '''Report the size of the recorded animation.
+
+        The frames are rendered but not displayed, and their JSON encodings
+        are measured with and without delta encoding. This is useful for
+        deciding whether to construct the animation with ``delta=True``.
+
+        At least two graphs must have been recorded.
+
+        :rtype: dict
+        :return: A dictionary with the number of ``'frames'`` and the sizes, in
+                 bytes, of the ``'full'`` and ``'encoded'`` frames.
+        '''
+        width, height = self._build_size()
+
+        count = 0
+        full = 0
+        encoded = 0
+        previous = None
+        for frame in self._build_frames(width, height, False):
+            count += 1
+            full += _measure(frame)
+            if previous is None:
+                encoded += _measure(frame)
+            else:
+                encoded += _measure(_encode_frame(previous, frame))
+            previous = frame
+
+        return {
+            'frames': count,
+            'full': full,
+            'encoded': encoded,
+        }
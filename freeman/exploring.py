@@ -42,9 +42,8 @@ import networkx as nx
 
 from math import isclose, isinf, log
 from statistics import mean
-from colorsys import rgb_to_hsv, hsv_to_rgb
-
 from .drawing import get_node_label
+from .coloring import color_to_hsv, colors_to_hsv, hsv_to_color, hsv_to_colors
 
 
 def _stringify(value, ndigits):
@@ -55,16 +54,6 @@ def _stringify(value, ndigits):
     return str(value)
 
 
-def _transform(h, s, v):
-    sr, sg, sb = hsv_to_rgb(h, s, v)
-
-    r = round(sr * 255)
-    g = round(sg * 255)
-    b = round(sb * 255)
-
-    return r, g, b
-
-
 def _assert_fraction(value):
     value = assert_numeric(value)
     if value < 0 or value > 1:
@@ -103,23 +92,6 @@ def _assert_reference(values, lower, upper, middle):
     return middle
 
 
-def _assert_hsv(color):
-    if not isinstance(color, (tuple, list)):
-        raise TypeError('color must be a tuple or list')
-    if len(color) != 3:
-        raise ValueError('color must have exactly three elements')
-    if not isinstance(color[0], int) or not isinstance(color[1], int) or not isinstance(color[2], int):
-        raise TypeError('all color elements must be integers')
-    if color[0] < 0 or color[0] > 255 or color[1] < 0 or color[1] > 255 or color[2] < 0 or color[2] > 255:
-        raise ValueError('all color elements must be between 0 and 255')
-
-    sr = color[0] / 255
-    sg = color[1] / 255
-    sb = color[2] / 255
-
-    return rgb_to_hsv(sr, sg, sb)
-
-
 def assert_numeric(value):
     if not isinstance(value, (int, float)):
         raise TypeError('value must be numeric')
@@ -185,13 +157,12 @@ def label_edges(g, map=None, ndigits=2):
 def color_borders(g, dark=0.5):
     f = 1 - _assert_fraction(dark)
 
-    for n in g.nodes:
-        if 'color' in g.nodes[n]:
-            h, s, v = _assert_hsv(g.nodes[n]['color'])
-        else:
-            h, s, v = 0, 0, 1
+    hsvs = colors_to_hsv([g.nodes[n].get('color', (255, 255, 255)) for n in g.nodes])
 
-        g.nodes[n]['bcolor'] = _transform(h, s, f * v)
+    bcolors = hsv_to_colors([h for h, _, _ in hsvs], [s for _, s, _ in hsvs], [f * v for _, _, v in hsvs])
+
+    for n, bcolor in zip(g.nodes, bcolors):
+        g.nodes[n]['bcolor'] = bcolor
 
 
 def color_nodes(g, map=None, dark=0):
@@ -210,7 +181,7 @@ def color_nodes(g, map=None, dark=0):
     s = 1 / len(groups)
     v = 1 - _assert_fraction(dark)
     for group in groups:
-        color = _transform(h, 1, v)
+        color = hsv_to_color(h, 1, v)
         for n in group:
             g.nodes[n]['color'] = color
         h += s
@@ -232,7 +203,7 @@ def color_edges(g, map=None, dark=0.5):
     s = 1 / len(groups)
     v = 1 - _assert_fraction(dark)
     for group in groups:
-        color = _transform(h, 1, v)
+        color = hsv_to_color(h, 1, v)
         for n, m in group:
             g.edges[n, m]['color'] = color
         h += s
@@ -243,7 +214,7 @@ def color_community_nodes(g, C, dark=0):
     s = 1 / len(C)
     v = 1 - _assert_fraction(dark)
     for c in C:
-        color = _transform(h, 1, v)
+        color = hsv_to_color(h, 1, v)
         for n in c:
             g.nodes[n]['color'] = color
         h += s
@@ -255,7 +226,7 @@ def color_community_edges(g, C, dark=0.5, alpha=0.5):
     v = 1 - _assert_fraction(dark)
     colors = {}
     for c in C:
-        color = _transform(h, 1, v)
+        color = hsv_to_color(h, 1, v)
         for n in c:
             colors[n] = color
         h += s
@@ -295,34 +266,37 @@ def scale_edges_width(g, map, lower=None, upper=None):
 def scale_nodes_dark(g, map, lower=None, upper=None, color=None):
     values, lower, upper = _assert_bounds(extract_nodes(g, map), lower, upper)
 
-    for n, value in zip(g.nodes, values):
-        if isclose(lower, upper):
-            sc = 0.5
-        else:
-            sc = (value - lower) / (upper - lower)
+    if isclose(lower, upper):
+        scs = [0.5 for value in values]
+    else:
+        scs = [(value - lower) / (upper - lower) for value in values]
 
-        if color is None:
-            c = 255 - round(sc * 255)
-            g.nodes[n]['color'] = (c, c, c)
-        else:
-            h, _, _ = _assert_hsv(color)
-            g.nodes[n]['color'] = _transform(h, sc, 1)
+    if color is None:
+        colors = [(255 - round(sc * 255),) * 3 for sc in scs]
+    else:
+        h, _, _ = color_to_hsv(color)
+        colors = hsv_to_colors([h] * len(scs), scs, [1] * len(scs))
+
+    for n, color in zip(g.nodes, colors):
+        g.nodes[n]['color'] = color
 
 
 def scale_edges_alpha(g, map, lower=None, upper=None, color=None):
     values, lower, upper = _assert_bounds(extract_edges(g, map), lower, upper)
 
-    for (n, m), value in zip(g.edges, values):
-        if isclose(lower, upper):
-            sc = 0.5
-        else:
-            sc = (value - lower) / (upper - lower)
+    if isclose(lower, upper):
+        scs = [0.5 for value in values]
+    else:
+        scs = [(value - lower) / (upper - lower) for value in values]
 
-        if color is None:
-            g.edges[n, m]['color'] = (0, 0, 0, sc)
-        else:
-            h, _, _ = _assert_hsv(color)
-            g.edges[n, m]['color'] = (*_transform(h, 1, 1), sc)
+    if color is None:
+        rgb = (0, 0, 0)
+    else:
+        h, _, _ = color_to_hsv(color)
+        rgb = hsv_to_color(h, 1, 1)
+
+    for (n, m), sc in zip(g.edges, scs):
+        g.edges[n, m]['color'] = (*rgb, sc)
 
 
 def heat_nodes(g, map, lower=None, upper=None, middle=None, classic=False):
@@ -342,7 +316,7 @@ def heat_nodes(g, map, lower=None, upper=None, middle=None, classic=False):
                 else:
                     h = 2 / 3
                     s = 1 - sc
-                g.nodes[n]['color'] = _transform(h, s, 1)
+                g.nodes[n]['color'] = hsv_to_color(h, s, 1)
             else:
                 sc = (value - middle) / (upper - middle)
                 if classic:
@@ -351,7 +325,7 @@ def heat_nodes(g, map, lower=None, upper=None, middle=None, classic=False):
                 else:
                     h = 0
                     s = sc
-                g.nodes[n]['color'] = _transform(h, s, 1)
+                g.nodes[n]['color'] = hsv_to_color(h, s, 1)
 
 
 def heat_edges(g, map, lower=None, upper=None, middle=None, classic=False):
@@ -371,7 +345,7 @@ def heat_edges(g, map, lower=None, upper=None, middle=None, classic=False):
                 else:
                     h = 2 / 3
                     a = 1 - sc
-                g.edges[n, m]['color'] = (*_transform(h, 1, 1), a)
+                g.edges[n, m]['color'] = (*hsv_to_color(h, 1, 1), a)
             else:
                 sc = (value - middle) / (upper - middle)
                 if classic:
@@ -380,7 +354,7 @@ def heat_edges(g, map, lower=None, upper=None, middle=None, classic=False):
                 else:
                     h = 0
                     a = sc
-                g.edges[n, m]['color'] = (*_transform(h, 1, 1), a)
+                g.edges[n, m]['color'] = (*hsv_to_color(h, 1, 1), a)
 
 
 def stack_and_track(graphs, subjects=[]):
@@ -408,12 +382,12 @@ def stack_and_track(graphs, subjects=[]):
                     h.nodes[curr]['label'] = '{} ({})'.format(label, i + 1)
 
                 color = h.nodes[curr].get('color', (255, 255, 255))
-                hue, sat, val = _assert_hsv(color)
-                h.nodes[curr]['color'] = _transform(hue, frac * sat, 1 - frac * (1 - val))
+                hue, sat, val = color_to_hsv(color)
+                h.nodes[curr]['color'] = hsv_to_color(hue, frac * sat, 1 - frac * (1 - val))
 
                 bcolor = h.nodes[curr].get('bcolor', (0, 0, 0))
-                hue, sat, val = _assert_hsv(bcolor)
-                h.nodes[curr]['bcolor'] = _transform(hue, frac * sat, 1 - frac * (1 - val))
+                hue, sat, val = color_to_hsv(bcolor)
+                h.nodes[curr]['bcolor'] = hsv_to_color(hue, frac * sat, 1 - frac * (1 - val))
 
                 if prev is not None and n in subjects:
                     h.add_edge(prev, curr)
@@ -0,0 +1,41 @@
+'''Module responsible for running tasks in parallel processes.
+
+The tasks of a call usually read a large shared value, such as a graph or the
+data of a test, so this value is sent once to each process, when it starts,
+instead of once per task. The current process never keeps a reference to it,
+so it can be collected as soon as the call ends.
+'''
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# only assigned in the processes started below
+_shared = ()
+
+
+def _share(shared):
+    global _shared
+    _shared = shared
+
+
+def _apply(function, task):
+    return function(*_shared, task)
+
+
+def _imap(function, tasks, workers, *shared):
+    if workers == 1:
+        for task in tasks:
+            yield function(*shared, task)
+        return
+    # the pending tasks are bounded, so a long generator of tasks is never fully consumed in advance
+    executor = ProcessPoolExecutor(workers, initializer=_share, initargs=(shared,))
+    try:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_apply, function, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,192 @@
+'''Module responsible for rendering graph files without a notebook.
+
+The functions below load `GML <https://networkx.org/documentation/stable/reference/readwrite/gml.html>`_
+files with :func:`load <freeman.load>`, optionally apply a skin and a layout,
+and write the static visualizations of :func:`draw <freeman.drawing.draw>` to
+HTML or JSON files. Neither Plotly nor pyvis is imported and the notebook is
+never initialized, so they are suitable for batch jobs.
+
+The module can also be run from the command line::
+
+    python -m freeman.render <source> <target> [--skin SKIN] [--layout LAYOUT] [--format FORMAT] [--backend BACKEND] [--compact] [--workers WORKERS]
+'''
+import os
+import sys
+
+from warnings import warn
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+
+from . import load, skin_seaborn, skin_pyvis
+from .drawing import BACKENDS, SAVE_FORMATS, render_html, render_json
+from .moving import LAYOUTS, move
+
+
+SKINS = {
+    'seaborn': skin_seaborn,
+    'pyvis': skin_pyvis,
+}
+
+
+def _render_task(task):
+    # a failure is returned instead of raised, so one invalid file does not stop the others
+    try:
+        return _render(*task), None
+    except Exception as error:
+        return task[0], '{}: {}'.format(type(error).__name__, error)
+
+
+def _render(source, target, skin, layout, format, backend, compact):
+    g = load(source)
+    if skin is not None:
+        SKINS[skin](g)
+    if layout is not None:
+        move(g, layout)
+
+    if format == 'html':
+        render_html(g, target, backend=backend, compact=compact, cache=False)
+    else:
+        render_json(g, target, backend=backend, compact=compact, cache=False)
+
+    return target
+
+
+def _build_tasks(source, target, skin, layout, format, backend, compact):
+    if not isinstance(source, str):
+        raise TypeError('render source must be a string')
+    if not os.path.isdir(source):
+        raise ValueError('render source must be a directory')
+
+    if not isinstance(target, str):
+        raise TypeError('render target must be a string')
+
+    if skin is not None:
+        if not isinstance(skin, str):
+            raise TypeError('render skin must be a string')
+        if skin not in SKINS:
+            raise KeyError('render skin must be one of the following: ' + ', '.join('\'{}\''.format(s) for s in SKINS))
+
+    if layout is not None:
+        if not isinstance(layout, str):
+            raise TypeError('render layout must be a string')
+        if layout not in LAYOUTS:
+            raise KeyError('render layout must be one of the following: ' + ', '.join('\'{}\''.format(k) for k in LAYOUTS))
+
+    if not isinstance(format, str):
+        raise TypeError('render format must be a string')
+    if format not in SAVE_FORMATS:
+        raise KeyError('render format must be one of the following: ' + ', '.join('\'{}\''.format(f) for f in SAVE_FORMATS))
+
+    os.makedirs(target, exist_ok=True)
+
+    tasks = []
+    for name in sorted(os.listdir(source)):
+        root, extension = os.path.splitext(name)
+        if extension == '.gml':
+            tasks.append((os.path.join(source, name), os.path.join(target, '{}.{}'.format(root, format)), skin, layout, format, backend, compact))
+
+    return tasks
+
+
+def _render_dir(source, target, skin, layout, format, backend, compact, workers):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int):
+        raise TypeError('render workers must be an integer')
+    if workers <= 0:
+        raise ValueError('render workers must be positive')
+
+    tasks = _build_tasks(source, target, skin, layout, format, backend, compact)
+
+    if workers == 1 or len(tasks) < 2:
+        results = [_render_task(task) for task in tasks]
+    else:
+        # a few tasks per message amortize the cost of sending them to the processes
+        chunksize = max(1, len(tasks) // (4 * workers))
+        with ProcessPoolExecutor(min(workers, len(tasks))) as executor:
+            results = list(executor.map(_render_task, tasks, chunksize=chunksize))
+
+    paths = [path for path, error in results if error is None]
+    failures = [(path, error) for path, error in results if error is not None]
+    return paths, failures
+
+
+def render_dir(source, target, skin=None, layout=None, format='html', backend=None, compact=False, workers=None):
+    '''Render all GML files of a directory.
+
+    Each file **<name>.gml** in the source directory is rendered to
+    **<name>.html** or **<name>.json** in the target directory, which is created
+    if it does not exist. The files are rendered in parallel and the :func:`render
+    cache <freeman.drawing.cache_info>` is not used, since each graph is
+    rendered once.
+
+    :type source: str
+    :param source: Path of the source directory.
+
+    :type target: str
+    :param target: Path of the target directory.
+
+    :type skin: str
+    :param skin: Either ``'seaborn'`` or ``'pyvis'``. If ``None``, no skin is applied.
+
+    :type layout: str
+    :param layout: Any key accepted by :func:`move <freeman.moving.move>`. If ``None``,
+                   the positions in the files are kept.
+
+    :type format: str
+    :param format: Either ``'html'`` or ``'json'``. See :func:`render_html
+                   <freeman.drawing.render_html>` and :func:`render_json
+                   <freeman.drawing.render_json>`.
+
+    :type backend: str
+    :param backend: Either ``'svg'`` or ``'webgl'``. See :func:`draw <freeman.drawing.draw>`.
+
+    :type compact: bool
+    :param compact: Whether to render all nodes in a single trace. See :func:`draw
+                    <freeman.drawing.draw>`.
+
+    :type workers: int
+    :param workers: Number of processes. Must be positive. If ``None``, the number of CPUs
+                    is used.
+
+    :rtype: list
+    :return: The paths of the rendered files, in the order of the source names.
+             A file that cannot be rendered is skipped with a warning that shows
+             its path and error, and the others are still rendered.
+    '''
+    paths, failures = _render_dir(source, target, skin, layout, format, backend, compact, workers)
+    for path, error in failures:
+        warn('{}: {}, skipping'.format(path, error))
+    return paths
+
+
+def main(args=None):
+    '''Run the command line interface. The paths of the rendered files are
+    printed, and the paths and errors of the failed ones are printed to the
+    standard error, in which case the exit status is ``1``.
+
+    :type args: list
+    :param args: The command line arguments. If ``None``, :data:`sys.argv` is used.
+    '''
+    parser = ArgumentParser(prog='python -m freeman.render', description='Render all GML files of a directory.')
+    parser.add_argument('source', help='source directory')
+    parser.add_argument('target', help='target directory')
+    parser.add_argument('--skin', choices=list(SKINS))
+    parser.add_argument('--layout', choices=list(LAYOUTS))
+    parser.add_argument('--format', choices=SAVE_FORMATS, default='html')
+    parser.add_argument('--backend', choices=BACKENDS)
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(args)
+
+    paths, failures = _render_dir(args.source, args.target, args.skin, args.layout, args.format, args.backend, args.compact, args.workers)
+    for path in paths:
+        print(path)
+    for path, error in failures:
+        print('{}: {}'.format(path, error), file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join('..')))
+
+import unittest
+import itertools
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+import freeman as fm
+
+
+X = [1, 3, 2, 5, 4, 7, 6]
+Y = [2, 1, 4, 3, 6, 5, 8]
+C = ['a', 'a', 'b', 'b', 'c', 'c', 'a']
+D = ['x', 'x', 'y', 'y', 'z', 'z', 'x']
+
+
+class AnalyzingTest(unittest.TestCase):
+    def frame(self):
+        return pd.DataFrame({'x': X, 'y': Y, 'c': C, 'd': D})
+
+    def test_cortest(self):
+        r, p = fm.cortest(self.frame(), 'x', 'y')
+        self.assertAlmostEqual(r, 0.608175, 6)
+    def test_cortest_exact(self):
+        r, p = fm.cortest(self.frame(), 'x', 'y', 0)
+        self.assertAlmostEqual(p, 0.160317, 6)
+    def test_cortest_random(self):
+        _, p = fm.cortest(self.frame(), 'x', 'y', 1000, seed=0)
+        self.assertAlmostEqual(p, 0.160317, 1)
+    def test_cortest_seed(self):
+        _, p1 = fm.cortest(self.frame(), 'x', 'y', 1000, seed=1)
+        _, p2 = fm.cortest(self.frame(), 'x', 'y', 1000, seed=1)
+        self.assertEqual(p1, p2)
+    def test_cortest_chunk(self):
+        _, p1 = fm.cortest(self.frame(), 'x', 'y', 0, chunk=7)
+        _, p2 = fm.cortest(self.frame(), 'x', 'y', 0)
+        self.assertEqual(p1, p2)
+    def test_cortest_large_chunk(self):
+        _, p = fm.cortest(self.frame(), 'x', 'y', 'auto', seed=0, chunk=7 * 2 * fm.PERM_BLOCK)
+        self.assertEqual(p.resamples % (2 * fm.PERM_BLOCK), 0)
+    def test_cortest_float_chunk(self):
+        self.assertRaises(TypeError, fm.cortest, self.frame(), 'x', 'y', 10, chunk=0.5)
+    def test_cortest_nonpositive_chunk(self):
+        self.assertRaises(ValueError, fm.cortest, self.frame(), 'x', 'y', 10, chunk=0)
+
+    def test_cortest_exact_fallback(self):
+        x = list(range(12))
+        self.assertWarns(UserWarning, fm.cortest_loose, x, x[::-1], 0)
+    def test_cortest_workers(self):
+        _, p1 = fm.cortest(self.frame(), 'x', 'y', 3000, seed=2, workers=1)
+        _, p2 = fm.cortest(self.frame(), 'x', 'y', 3000, seed=2, workers=2)
+        self.assertEqual(p1, p2)
+    def test_cortest_float_workers(self):
+        self.assertRaises(TypeError, fm.cortest, self.frame(), 'x', 'y', 10, workers=0.5)
+    def test_cortest_nonpositive_workers(self):
+        self.assertRaises(ValueError, fm.cortest, self.frame(), 'x', 'y', 10, workers=0)
+
+    def test_cortest_auto(self):
+        _, p = fm.cortest(self.frame(), 'x', 'y', 'auto', seed=0)
+        self.assertTrue(0 < p.resamples < fm.AUTO_PERM)
+        self.assertEqual(p.resamples % fm.AUTO_BLOCK, 0)
+    def test_cortest_auto_workers(self):
+        result1 = fm.cortest(self.frame(), 'x', 'y', 'auto', seed=3, workers=1)
+        result2 = fm.cortest(self.frame(), 'x', 'y', 'auto', seed=3, workers=2)
+        self.assertEqual(result1, result2)
+        self.assertEqual(result1[1].resamples, result2[1].resamples)
+    def test_cortest_auto_tolerance(self):
+        _, p1 = fm.cortest(self.frame(), 'x', 'y', 'auto', seed=0, alpha=0.16, tolerance=0.2)
+        _, p2 = fm.cortest(self.frame(), 'x', 'y', 'auto', seed=0, alpha=0.16, tolerance=0.05)
+        self.assertLess(p1.resamples, p2.resamples)
+    def test_cortest_invalid_max_perm(self):
+        self.assertRaises(ValueError, fm.cortest, self.frame(), 'x', 'y', 'all')
+    def test_cortest_negative_max_perm(self):
+        self.assertRaises(ValueError, fm.cortest, self.frame(), 'x', 'y', -1)
+    def test_cortest_invalid_alpha(self):
+        self.assertRaises(ValueError, fm.cortest, self.frame(), 'x', 'y', 'auto', alpha=1)
+    def test_cortest_invalid_tolerance(self):
+        self.assertRaises(ValueError, fm.cortest, self.frame(), 'x', 'y', 'auto', tolerance=0)
+
+    def test_chitest_exact(self):
+        v, p = fm.chitest(self.frame(), 'c', 'd', 0)
+        self.assertAlmostEqual(v, 1.0, 6)
+        self.assertAlmostEqual(p, 0.009524, 6)
+    def test_chitest_random(self):
+        _, p = fm.chitest(self.frame(), 'c', 'd', 1000, seed=0)
+        self.assertAlmostEqual(p, 0.009524, 1)
+    def test_chitest_seed(self):
+        _, p1 = fm.chitest(self.frame(), 'c', 'd', 1000, seed=1)
+        _, p2 = fm.chitest(self.frame(), 'c', 'd', 1000, seed=1)
+        self.assertEqual(p1, p2)
+    def test_chitest_nodes(self):
+        g = fm.Graph(nx.florentine_families_graph())
+        g.set_nodedata('c', lambda n: len(n) % 2)
+        g.set_nodedata('d', lambda n: g.degree(n) > 2)
+        v, p = g.chitest_nodes('c', 'd', 100, seed=0)
+        self.assertTrue(0 <= p <= 1)
+
+    def test_chitest_workers(self):
+        _, p1 = fm.chitest(self.frame(), 'c', 'd', 3000, seed=2, workers=1)
+        _, p2 = fm.chitest(self.frame(), 'c', 'd', 3000, seed=2, workers=2)
+        self.assertEqual(p1, p2)
+
+    def test_indtest_exact(self):
+        p = fm.indtest_loose([1, 2, 3], [2, 4, 6, 9], 0)
+        self.assertAlmostEqual(p, 0.171429, 6)
+    def test_indtest_zero_variance(self):
+        self.assertIsNone(fm.indtest_loose([1, 1], [2, 2, 1], 0))
+    def test_indtest_random(self):
+        p = fm.indtest_loose([1, 2, 3], [2, 4, 6, 9], 5000, seed=0)
+        self.assertAlmostEqual(p, 0.171429, 1)
+    def test_indtest_workers(self):
+        p1 = fm.indtest(self.frame(), 'x', 'y', 3000, seed=2, workers=1)
+        p2 = fm.indtest(self.frame(), 'x', 'y', 3000, seed=2, workers=2)
+        self.assertEqual(p1, p2)
+
+    def test_reltest_exact(self):
+        p = fm.reltest_loose([1, 2, 3, 5, 8, 2, 4, 1], [2, 4, 1, 7, 9, 3, 3, 4], 0)
+        self.assertAlmostEqual(p, 0.242188, 6)
+    def test_reltest_zero_variance(self):
+        self.assertIsNone(fm.reltest_loose([1, 2, 3], [0, 3, 2], 0))
+    def test_reltest_exact_large(self):
+        a = list(range(30))
+        b = [i + (i % 3) + (i % 4) - 2 for i in range(30)]
+        p1 = fm.reltest_loose(a, b, 0)
+        p2 = fm.reltest_loose(a, b, 20000, seed=0)
+        self.assertAlmostEqual(p1, p2, delta=0.02)
+    def test_reltest_exact_fallback(self):
+        self.assertWarns(UserWarning, fm.reltest_loose, range(60), [i + 0.5 * (i % 3) for i in range(60)], 0)
+    def test_reltest_workers(self):
+        p1 = fm.reltest(self.frame(), 'x', 'y', 3000, seed=2, workers=1)
+        p2 = fm.reltest(self.frame(), 'x', 'y', 3000, seed=2, workers=2)
+        self.assertEqual(p1, p2)
+
+    def test_indtest_auto(self):
+        p = fm.indtest(self.frame(), 'x', 'y', 'auto', seed=0)
+        self.assertTrue(0 <= p <= 2)
+        self.assertGreater(p.resamples, 0)
+    def test_mixtest_zero_variance(self):
+        df = fm.mixtest_loose([1, 2, 1, 2, 3], ['a', 'a', 'b', 'b', 'c'], 0)
+        self.assertTrue(df['p-value'].isna().iloc[0])
+    def test_mixtest_auto(self):
+        df = fm.mixtest(self.frame(), 'x', 'c', 'auto', seed=0)
+        self.assertEqual(list(df.columns), ['p-value'])
+        self.assertTrue((df.attrs['resamples'] > 0).all())
+
+    def test_mixtest_workers(self):
+        df1 = fm.mixtest(self.frame(), 'x', 'c', 300, seed=2, workers=1)
+        df2 = fm.mixtest(self.frame(), 'x', 'c', 300, seed=2, workers=2)
+        self.assertTrue(df1.equals(df2))
+
+    def test_nodeframe_cached(self):
+        g = fm.Graph(nx.florentine_families_graph())
+        g.set_nodedata('d', lambda n: g.degree(n))
+        self.assertIs(g.nodeframe, g.nodeframe)
+    def test_nodeframe_add_node(self):
+        g = fm.Graph(nx.florentine_families_graph())
+        g.set_nodedata('d', lambda n: g.degree(n))
+        g.add_node('Other')
+        self.assertEqual(list(g.nodeframe.index), list(g.nodes))
+        self.assertTrue(g.nodeframe['d'].isna()['Other'])
+    def test_edgeframe_flip_existence(self):
+        g = fm.Graph(nx.path_graph(4))
+        g.set_edgedata('w', lambda n, m: n + m)
+        g.flip_existence(0, 1)
+        g.flip_existence(0, 2)
+        self.assertEqual(list(g.edgeframe.index), list(g.edges))
+        self.assertTrue(g.edgeframe['w'].isna()[(0, 2)])
+    def test_nodeframe_invalidate(self):
+        g = fm.Graph(nx.path_graph(4))
+        g.set_nodedata('d', lambda n: n)
+        g.__wrapped__.remove_node(1)
+        g.__wrapped__.add_node(5)
+        g.invalidate()
+        self.assertEqual(list(g.nodeframe.index), list(g.nodes))
+        self.assertTrue(g.nodeframe['d'].isna()[5])
+    def test_edgeframe_invalidate(self):
+        g = fm.Graph(nx.path_graph(4))
+        g.set_edgedata('w', lambda n, m: n + m)
+        g.__wrapped__.remove_edge(0, 1)
+        g.__wrapped__.add_edge(0, 2)
+        g.invalidate()
+        self.assertEqual(list(g.edgeframe.index), list(g.edges))
+        self.assertTrue(g.edgeframe['w'].isna()[(0, 2)])
+    def test_pull_nodedata(self):
+        g = fm.Graph(nx.path_graph(4))
+        g.set_each_node('d', lambda n: 2 * n)
+        g.pull_nodedata('d')
+        self.assertEqual(list(g.nodeframe['d']), [0, 2, 4, 6])
+    def test_push_edgedata(self):
+        g = fm.Graph(nx.path_graph(4))
+        g.set_edgedata('w', lambda n, m: n + m)
+        g.push_edgedata('w')
+        self.assertEqual(g.edges[1, 2]['w'], 3)
+
+    def women(self):
+        g = fm.Graph(nx.davis_southern_women_graph())
+        return g, [n for n in g.nodes if g.nodes[n]['bipartite'] == 0]
+
+    def test_analyze_to_move(self):
+        g, nodes = self.women()
+        g.analyze_to_move(nodes)
+        x, y = g.nodes['Evelyn Jefferson']['pos']
+        self.assertAlmostEqual(x, -0.799440, 6)
+        self.assertAlmostEqual(y, 0.112783, 6)
+    def test_analyze_to_move_sparse(self):
+        g, nodes = self.women()
+        h = g.copy()
+        g.analyze_to_move(nodes)
+        dense = fm.analyzing.CA_DENSE
+        fm.analyzing.CA_DENSE = 0
+        try:
+            h.analyze_to_move(nodes)
+        finally:
+            fm.analyzing.CA_DENSE = dense
+        for n in g.nodes:
+            self.assertAlmostEqual(g.nodes[n]['pos'][0], h.nodes[n]['pos'][0], 9)
+            self.assertAlmostEqual(g.nodes[n]['pos'][1], h.nodes[n]['pos'][1], 9)
+    def test_analyze_to_move_non_iterable(self):
+        g, _ = self.women()
+        self.assertRaises(TypeError, g.analyze_to_move, 0)
+    def test_analyze_to_move_improper(self):
+        g, _ = self.women()
+        self.assertRaises(ValueError, g.analyze_to_move, list(g.nodes))
+    def test_analyze_to_move_non_bipartition(self):
+        g, nodes = self.women()
+        g.add_edge(nodes[0], nodes[1])
+        self.assertRaises(ValueError, g.analyze_to_move, nodes)
+    def test_analyze_to_move_non_directed_bipartition(self):
+        g, nodes = self.women()
+        g = g.to_directed()
+        self.assertRaises(ValueError, g.analyze_to_move, nodes)
+    def test_projection(self):
+        g, nodes = self.women()
+        h = g.copy()
+        g.analyze_to_move(nodes)
+        fm.Projection(h, nodes).project(h)
+        for n in g.nodes:
+            self.assertAlmostEqual(g.nodes[n]['pos'][0], h.nodes[n]['pos'][0], 9)
+            self.assertAlmostEqual(g.nodes[n]['pos'][1], h.nodes[n]['pos'][1], 9)
+    def test_projection_different_nodes(self):
+        g, nodes = self.women()
+        projection = fm.Projection(g, nodes)
+        h = g.copy()
+        h.add_node('Other')
+        self.assertRaises(ValueError, projection.project, h)
+    def test_analyze_last_to_move_all_workers(self):
+        g, nodes = self.women()
+        h = g.copy()
+        h.remove_edge(nodes[0], 'E1')
+        graphs1 = [g.copy(), h.copy()]
+        graphs2 = [g.copy(), h.copy()]
+        fm.analyze_last_to_move_all(graphs1, nodes)
+        fm.analyze_last_to_move_all(graphs2, nodes, workers=2)
+        for g1, g2 in zip(graphs1, graphs2):
+            for n in g1.nodes:
+                self.assertEqual(g1.nodes[n]['pos'], g2.nodes[n]['pos'])
+    def test_corplot_twomode(self):
+        g, nodes = self.women()
+        g.corplot_twomode(nodes)
+
+    def assertDendrogram(self, g, levels, selector=lambda: None):
+        from scipy.cluster.hierarchy import cut_tree
+
+        # selectors can be stateful, so each run gets its own
+        linkage = np.array(fm.analyzing._girvan_newman_linkage(g, levels, selector()), dtype=float)
+        nodes = list(g.nodes)
+        partitions = nx.community.girvan_newman(g, selector())
+        for C in itertools.islice(partitions, levels):
+            # cutting the tree into as many clusters as the level must give back its partition
+            clusters = {}
+            for n, cluster in zip(nodes, cut_tree(linkage, n_clusters=len(C))[:, 0]):
+                clusters.setdefault(cluster, set()).add(n)
+            self.assertEqual({frozenset(c) for c in clusters.values()}, {frozenset(c) for c in C})
+
+    def test_girvan_newman(self):
+        g = fm.Graph(nx.karate_club_graph())
+        self.assertDendrogram(g, None)
+        g.girvan_newman()
+    def test_girvan_newman_disconnected(self):
+        g = fm.Graph(nx.disjoint_union(nx.path_graph(5), nx.cycle_graph(6)))
+        self.assertDendrogram(g, None)
+        g.girvan_newman()
+    def test_girvan_newman_levels(self):
+        g = fm.Graph(nx.karate_club_graph())
+        self.assertDendrogram(g, 3)
+        g.girvan_newman(3)
+    def test_girvan_newman_sampled(self):
+        g = fm.Graph(nx.karate_club_graph())
+        self.assertDendrogram(g, 5, lambda: fm.sampled_edge_selector(10, seed=0))
+        g.girvan_newman(5, fm.sampled_edge_selector(10, seed=0))
+    def test_sampled_edge_selector(self):
+        g = nx.karate_club_graph()
+        n, m = fm.sampled_edge_selector(10, seed=0)(g)
+        self.assertTrue(g.has_edge(n, m))
+    def test_girvan_newman_edgeless(self):
+        g = fm.Graph(nx.empty_graph(4))
+        g.girvan_newman()
+
+
+if __name__ == '__main__':
+    unittest.main()
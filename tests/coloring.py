@@ -0,0 +1,68 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join('..')))
+
+import unittest
+
+from freeman import coloring
+
+
+class ColoringTest(unittest.TestCase):
+    def test_parse_color(self):
+        self.assertEqual(coloring.parse_color(' rgb(1, 2, 3) '), (1, 2, 3))
+    def test_parse_color_alpha(self):
+        self.assertEqual(coloring.parse_color('rgba(1, 2, 3, 0.5)'), (1, 2, 3, 0.5))
+    def test_parse_color_interned(self):
+        self.assertIs(coloring.parse_color('rgb(4, 5, 6)'), coloring.parse_color('rgb(4, 5, 6)'))
+    def test_parse_color_other(self):
+        self.assertEqual(coloring.parse_color('label'), 'label')
+        self.assertEqual(coloring.parse_color(7), 7)
+    def test_parse_color_invalid(self):
+        self.assertRaises(ValueError, coloring.parse_color, 'rgb(1, 2)')
+        self.assertRaises(ValueError, coloring.parse_color, 'rgb(1, 2, 256)')
+    def test_parse_colors(self):
+        self.assertEqual(coloring.parse_colors(['rgb(1, 2, 3)', 'x']), [(1, 2, 3), 'x'])
+
+    def test_format_color(self):
+        self.assertEqual(coloring.format_color([1, 2, 3]), 'rgb(1, 2, 3)')
+    def test_format_color_alpha(self):
+        self.assertEqual(coloring.format_color((1, 2, 3, 1 / 3)), 'rgba(1, 2, 3, 0.333333)')
+    def test_format_color_typed(self):
+        self.assertEqual(coloring.format_color((1, 2, 3, 1)), 'rgba(1, 2, 3, 1)')
+        self.assertEqual(coloring.format_color((1, 2, 3, 1.0)), 'rgba(1, 2, 3, 1.0)')
+    def test_format_colors(self):
+        self.assertEqual(coloring.format_colors([(1, 2, 3), (1, 2, 3, 0)]), ['rgb(1, 2, 3)', 'rgba(1, 2, 3, 0)'])
+
+    def test_color_to_hsv(self):
+        self.assertEqual(coloring.color_to_hsv((255, 0, 0)), (0, 1, 1))
+    def test_color_to_hsv_invalid(self):
+        self.assertRaises(TypeError, coloring.color_to_hsv, 'red')
+        self.assertRaises(ValueError, coloring.color_to_hsv, (255, 0))
+        self.assertRaises(TypeError, coloring.color_to_hsv, (255, 0, 0.0))
+        self.assertRaises(ValueError, coloring.color_to_hsv, (256, 0, 0))
+    def test_colors_to_hsv(self):
+        self.assertEqual(coloring.colors_to_hsv([(0, 0, 0), [255, 255, 255]]), [(0, 0, 0), (0, 0, 1)])
+
+    def test_hsv_to_color(self):
+        self.assertEqual(coloring.hsv_to_color(2 / 3, 1, 1), (0, 0, 255))
+    def test_hsv_to_color_interned(self):
+        self.assertIs(coloring.hsv_to_color(0.5, 0.5, 0.5), coloring.hsv_to_color(0.5, 0.5, 0.5))
+    def test_hsv_to_colors(self):
+        self.assertEqual(coloring.hsv_to_colors([0, 0], [0, 1], [1, 1]), [(255, 255, 255), (255, 0, 0)])
+
+    def test_luminance(self):
+        self.assertAlmostEqual(coloring.luminance((255, 255, 255)), 1)
+        self.assertAlmostEqual(coloring.luminance((0, 0, 0, 0.5)), 0)
+    def test_luminance_out_of_range(self):
+        self.assertRaises(ValueError, coloring.luminance, (256, 0, 0))
+        self.assertRaises(ValueError, coloring.luminance, (0, -1, 0))
+        self.assertRaises(ValueError, coloring.is_dark, (0, 0, 255.5))
+    def test_is_dark(self):
+        self.assertTrue(coloring.is_dark((0, 0, 255)))
+        self.assertFalse(coloring.is_dark((255, 255, 0)))
+    def test_are_dark(self):
+        self.assertEqual(coloring.are_dark([(0, 0, 0), (255, 255, 255)]), [True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
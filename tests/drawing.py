@@ -1,17 +1,41 @@
+import io
 import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join('..')))
 
+import json
+import gzip
+import contextlib
+import math
+import tempfile
 import unittest
 
+import numpy as np
 import networkx as nx
 import freeman as fm
 
+from freeman import render
+
 
 N = 'Medici'
 M = 'Acciaiuoli'
 
 
+# pyvis writes its lib folder into the working directory, so the tests run inside a temporary one
+def setUpModule():
+    global TEMP, CWD
+    TEMP = tempfile.TemporaryDirectory()
+    CWD = os.getcwd()
+    os.chdir(TEMP.name)
+    fm.drawing.CACHE_DIR = os.path.join(TEMP.name, '__fmcache__')
+
+
+def tearDownModule():
+    fm.drawing.CACHE_DIR = fm.CACHE_DIR
+    os.chdir(CWD)
+    TEMP.cleanup()
+
+
 class DrawingTest(unittest.TestCase):
     def with_position(self, g):
         g = g.copy()
@@ -1545,6 +1569,43 @@ class DrawingTest(unittest.TestCase):
     def test_draw_digraph_with_upper_edge_labfrac(self):
         self.assertRaises(ValueError, fm.draw, self.with_upper_edge_labfrac(self.partial_digraph()))
 
+    def with_two_invalid_nodes(self, g):
+        g = g.copy()
+        g.nodes[M]['color'] = (0, 0, 256)
+        g.nodes[N]['size'] = 2.5
+        return g
+    def test_interact_graph_with_two_invalid_nodes(self):
+        self.assertRaises(ValueError, fm.interact, self.with_two_invalid_nodes(self.partial_graph()))
+    def test_interact_digraph_with_two_invalid_nodes(self):
+        self.assertRaises(ValueError, fm.interact, self.with_two_invalid_nodes(self.partial_digraph()))
+    def test_draw_graph_with_two_invalid_nodes(self):
+        self.assertRaises(ValueError, fm.draw, self.with_two_invalid_nodes(self.partial_graph()))
+    def test_draw_digraph_with_two_invalid_nodes(self):
+        self.assertRaises(ValueError, fm.draw, self.with_two_invalid_nodes(self.partial_digraph()))
+
+    def with_list_node_colors(self, g):
+        g = g.copy()
+        for n in g.nodes:
+            g.nodes[n]['color'] = [0, 0, 0]
+        return g
+    def test_interact_graph_with_list_node_colors(self):
+        fm.interact(self.with_list_node_colors(self.partial_graph()))
+    def test_interact_digraph_with_list_node_colors(self):
+        fm.interact(self.with_list_node_colors(self.partial_digraph()))
+
+    def with_numpy_edge_width(self, g):
+        g = g.copy()
+        g.edges[N, M]['width'] = np.int64(2)
+        return g
+    def test_interact_graph_with_numpy_edge_width(self):
+        self.assertRaises(TypeError, fm.interact, self.with_numpy_edge_width(self.partial_graph()))
+    def test_interact_digraph_with_numpy_edge_width(self):
+        self.assertRaises(TypeError, fm.interact, self.with_numpy_edge_width(self.partial_digraph()))
+    def test_draw_graph_with_numpy_edge_width(self):
+        self.assertRaises(TypeError, fm.draw, self.with_numpy_edge_width(self.partial_graph()))
+    def test_draw_digraph_with_numpy_edge_width(self):
+        self.assertRaises(TypeError, fm.draw, self.with_numpy_edge_width(self.partial_digraph()))
+
     def test_interact_graph_with_physics(self):
         fm.interact(self.partial_graph(), True)
     def test_interact_digraph_with_physics(self):
@@ -1563,6 +1624,178 @@ class DrawingTest(unittest.TestCase):
     def test_draw_digraph_with_none_toolbar(self):
         self.assertRaises(TypeError, fm.draw, self.partial_digraph(), None)
 
+    def test_draw_null_graph_with_webgl(self):
+        fm.draw(self.null_graph(), backend='webgl')
+    def test_draw_empty_graph_with_webgl(self):
+        fm.draw(self.empty_graph(), backend='webgl')
+    def test_draw_wrapped_graph_with_webgl(self):
+        fm.draw(self.with_node_extra(self.wrapped_graph()), backend='webgl')
+    def test_draw_wrapped_digraph_with_webgl(self):
+        fm.draw(self.with_node_extra(self.wrapped_digraph()), backend='webgl')
+    def test_draw_graph_with_svg(self):
+        fm.draw(self.partial_graph(), backend='svg')
+    def test_draw_graph_with_int_backend(self):
+        self.assertRaises(TypeError, fm.draw, self.partial_graph(), backend=0)
+    def test_draw_graph_with_invalid_backend(self):
+        self.assertRaises(KeyError, fm.draw, self.partial_graph(), backend='canvas')
+
+    def test_draw_graph_with_compact(self):
+        fm.draw(self.with_node_extra(self.partial_graph()), compact=True)
+    def test_draw_digraph_with_compact(self):
+        fm.draw(self.with_node_extra(self.partial_digraph()), compact=True)
+    def test_draw_graph_with_none_compact(self):
+        self.assertRaises(TypeError, fm.draw, self.partial_graph(), compact=None)
+    def test_draw_mimebundle(self):
+        bundle = fm.drawing._Figure('{"data": [], "layout": {}}', {'displayModeBar': False})._repr_mimebundle_()
+        self.assertEqual(bundle['application/vnd.plotly.v1+json'], {'data': [], 'layout': {}, 'config': {'displayModeBar': False}})
+        self.assertIn(fm.PLOTLY_URL[:-3], bundle['text/html'])
+
+    def test_render_html(self):
+        path = os.path.join(TEMP.name, 'render.html')
+        fm.render_html(self.with_node_extra(self.partial_digraph()), path)
+        with open(path) as file:
+            text = file.read()
+        self.assertIn('"bdata"', text)
+        self.assertIn(fm.PLOTLY_URL, text)
+    def test_render_html_same_as_animation(self):
+        path = os.path.join(TEMP.name, 'render.html')
+        fm.render_html(self.partial_graph(), path)
+        with open(path) as file:
+            text = file.read()
+        self.assertTrue(text.startswith(fm.drawing.HTML_HEAD))
+        self.assertTrue(text.endswith(fm.drawing.HTML_TAIL))
+    def test_render_html_with_int_path(self):
+        self.assertRaises(TypeError, fm.render_html, self.partial_graph(), 0)
+    def test_render_html_with_invalid_path(self):
+        self.assertRaises(ValueError, fm.render_html, self.partial_graph(), 'render.json')
+    def test_render_html_with_invalid_backend(self):
+        self.assertRaises(KeyError, fm.render_html, self.partial_graph(), 'render.html', backend='canvas')
+    def test_render_html_with_none_cache(self):
+        self.assertRaises(TypeError, fm.render_html, self.partial_graph(), 'render.html', cache=None)
+
+    def test_render_json(self):
+        path = os.path.join(TEMP.name, 'render.json')
+        fm.render_json(self.partial_graph(), path, cache=False)
+        with open(path) as file:
+            figure = json.load(file)
+        self.assertIn('data', figure)
+    def test_render_json_with_invalid_path(self):
+        self.assertRaises(ValueError, fm.render_json, self.partial_graph(), 'render.html')
+
+    def rendered_dir(self):
+        source = os.path.join(TEMP.name, 'gml')
+        os.makedirs(source, exist_ok=True)
+        nx.write_gml(nx.florentine_families_graph(), os.path.join(source, 'partial.gml'))
+        nx.write_gml(nx.complete_graph(15), os.path.join(source, 'complete.gml'))
+        return source, os.path.join(TEMP.name, 'rendered')
+    def test_render_dir(self):
+        source, target = self.rendered_dir()
+        paths = render.render_dir(source, target, 'seaborn', 'circular', workers=2)
+        self.assertEqual(paths, [os.path.join(target, 'complete.html'), os.path.join(target, 'partial.html')])
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+    def test_render_dir_json(self):
+        source, target = self.rendered_dir()
+        for path in render.render_dir(source, target, format='json', workers=1):
+            with open(path) as file:
+                self.assertIn('data', json.load(file))
+    def test_render_dir_with_invalid_skin(self):
+        source, target = self.rendered_dir()
+        self.assertRaises(KeyError, render.render_dir, source, target, skin='matplotlib')
+    def test_render_dir_with_nonpositive_workers(self):
+        source, target = self.rendered_dir()
+        self.assertRaises(ValueError, render.render_dir, source, target, workers=0)
+    def broken_dir(self):
+        source, _ = self.rendered_dir()
+        broken = os.path.join(TEMP.name, 'broken')
+        os.makedirs(broken, exist_ok=True)
+        for name in ['partial.gml', 'complete.gml']:
+            with open(os.path.join(source, name)) as src, open(os.path.join(broken, name), 'w') as dst:
+                dst.write(src.read())
+        with open(os.path.join(broken, 'invalid.gml'), 'w') as file:
+            file.write('graph [ node_color "rgb(1, 2)" node [ id 0 ] ]')
+        return broken, os.path.join(TEMP.name, 'broken_rendered')
+    def test_render_dir_with_invalid_file(self):
+        source, target = self.broken_dir()
+        with self.assertWarns(UserWarning) as context:
+            paths = render.render_dir(source, target, workers=2)
+        self.assertEqual(paths, [os.path.join(target, 'complete.html'), os.path.join(target, 'partial.html')])
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+        self.assertIn(os.path.join(source, 'invalid.gml'), str(context.warning))
+    def test_render_main_with_invalid_file(self):
+        source, target = self.broken_dir()
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(SystemExit) as context:
+                render.main([source, target, '--workers', '1'])
+        self.assertEqual(context.exception.code, 1)
+        self.assertIn(os.path.join(source, 'invalid.gml'), stderr.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(target, 'partial.html')))
+    def test_render_main(self):
+        source, target = self.rendered_dir()
+        render.main([source, target, '--layout', 'random', '--compact', '--workers', '1'])
+        self.assertTrue(os.path.exists(os.path.join(target, 'partial.html')))
+
+    def test_cache_draw(self):
+        fm.cache_clear()
+        g = self.partial_graph()
+        fm.draw(g)
+        fm.draw(g)
+        g.nodes[N]['color'] = (255, 0, 0)
+        fm.draw(g)
+        info = fm.cache_info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 2)
+        self.assertEqual(info['files'], 2)
+    def test_cache_format(self):
+        fm.cache_clear()
+        g = self.partial_graph()
+        fm.draw(g)
+        format = fm.drawing.CACHE_FORMAT
+        fm.drawing.CACHE_FORMAT = format + 1
+        try:
+            fm.draw(g)
+        finally:
+            fm.drawing.CACHE_FORMAT = format
+        info = fm.cache_info()
+        self.assertEqual(info['hits'], 0)
+        self.assertEqual(info['misses'], 2)
+    def test_cache_interact(self):
+        fm.cache_clear()
+        g = self.partial_graph()
+        fm.interact(g)
+        fm.interact(g)
+        info = fm.cache_info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 1)
+    def test_cache_limit(self):
+        fm.cache_clear()
+        limit = fm.drawing.CACHE_LIMIT
+        fm.drawing.CACHE_LIMIT = 0
+        try:
+            fm.draw(self.partial_graph())
+        finally:
+            fm.drawing.CACHE_LIMIT = limit
+        self.assertEqual(fm.cache_info()['files'], 0)
+    def test_cache_size(self):
+        fm.cache_clear()
+        fm.draw(self.partial_graph())
+        fm.draw(self.partial_digraph())
+        self.assertEqual(fm.drawing._cache_sizes[fm.drawing.CACHE_DIR], fm.cache_info()['size'])
+    def test_cache_limit_without_listing(self):
+        fm.cache_clear()
+        fm.draw(self.partial_graph())
+        entries = fm.drawing._cache_entries
+        fm.drawing._cache_entries = None
+        try:
+            fm.draw(self.partial_digraph())
+        finally:
+            fm.drawing._cache_entries = entries
+        self.assertEqual(fm.cache_info()['files'], 2)
+    def test_cache_clear(self):
+        fm.draw(self.partial_graph())
+        fm.cache_clear()
+        self.assertEqual(fm.cache_info(), {'hits': 0, 'misses': 0, 'files': 0, 'size': 0})
+
     def test_animation_with_width(self):
         fm.Animation(width=800)
     def test_animation_with_float_width(self):
@@ -1598,7 +1831,243 @@ class DrawingTest(unittest.TestCase):
         a.rec(self.partial_digraph())
         a.rec(self.partial_digraph())
         a.play()
-
+    def test_animation_with_two_same_size_graphs(self):
+        a = fm.Animation()
+        g = nx.Graph([(0, 1)])
+        g.add_nodes_from([2, 5])
+        a.rec(self.with_position(g))
+        h = nx.Graph([(0, 1)])
+        h.add_nodes_from([3, 4])
+        a.rec(self.with_position(h))
+        self.assertEqual(set(a._build_union().nodes), {0, 1, 2, 3, 4, 5})
+    def test_animation_with_two_compact_graphs(self):
+        a = fm.Animation(compact=True)
+        g = self.partial_graph()
+        a.rec(g)
+        g.remove_node(N)
+        g.add_edge(M, 'Other', color=(255, 0, 0))
+        g.nodes['Other']['pos'] = (0.5, 0.5)
+        a.rec(g)
+        a.play()
+    def test_animation_with_two_compact_digraphs(self):
+        a = fm.Animation(compact=True)
+        a.rec(self.with_node_extra(self.partial_digraph()))
+        a.rec(self.partial_digraph())
+        a.play()
+    def test_animation_compact_renders_once(self):
+        a = fm.Animation(compact=True, workers=1)
+        g = self.partial_graph()
+        a.rec(g)
+        g.add_edge(M, 'Other', color=(255, 0, 0))
+        g.nodes['Other']['pos'] = (0.5, 0.5)
+        a.rec(g)
+        calls = []
+        build_frame = fm.drawing._build_frame
+        def counted(*args):
+            calls.append(None)
+            return build_frame(*args)
+        fm.drawing._build_frame = counted
+        try:
+            file = io.BytesIO()
+            a.save(file)
+        finally:
+            fm.drawing._build_frame = build_frame
+        self.assertEqual(len(calls), 2)
+        frames = json.loads(file.getvalue())['frames']
+        self.assertEqual(len(frames[0]['data']), len(frames[1]['data']))
+    def test_animation_with_none_compact(self):
+        self.assertRaises(TypeError, fm.Animation, compact=None)
+    def test_animation_with_two_delta_graphs(self):
+        a = fm.Animation(delta=True)
+        g = self.partial_graph()
+        a.rec(g)
+        g.nodes[N]['color'] = (255, 0, 0)
+        a.rec(g)
+        a.play()
+    def test_animation_with_two_delta_digraphs(self):
+        a = fm.Animation(compact=True, delta=True)
+        g = self.partial_digraph()
+        a.rec(g)
+        g.remove_node(N)
+        a.rec(g)
+        a.play()
+    def test_animation_with_none_delta(self):
+        self.assertRaises(TypeError, fm.Animation, delta=None)
+    def test_animation_with_two_diff_graphs(self):
+        a = fm.Animation(diff=True)
+        g = self.partial_graph()
+        a.rec(g)
+        g.nodes[N]['color'] = (255, 0, 0)
+        g.remove_edge(N, M)
+        g.add_edge(M, 'Other')
+        g.nodes['Other']['pos'] = (0.5, 0.5)
+        a.rec(g)
+        a.play()
+    def test_animation_with_three_diff_digraphs(self):
+        a = fm.Animation(diff=True)
+        g = self.partial_digraph()
+        a.rec(g)
+        g.remove_node(N)
+        a.rec(g)
+        a.rec(g.reverse())
+        a.play()
+    def test_animation_with_none_diff(self):
+        self.assertRaises(TypeError, fm.Animation, diff=None)
+    def saved_animation(self):
+        a = fm.Animation()
+        g = self.partial_graph()
+        a.rec(g)
+        g.nodes[N]['color'] = (255, 0, 0)
+        a.rec(g)
+        return a
+    def test_animation_save_json(self):
+        a = self.saved_animation()
+        file = io.BytesIO()
+        a.save(file)
+        figure = json.loads(file.getvalue())
+        self.assertEqual(len(figure['frames']), 2)
+    def test_animation_save_gzip(self):
+        a = self.saved_animation()
+        file = io.BytesIO()
+        a.save(file, gzip=True)
+        figure = json.loads(gzip.decompress(file.getvalue()))
+        self.assertEqual(len(figure['frames']), 2)
+    def test_animation_save_html(self):
+        a = self.saved_animation()
+        path = os.path.join(TEMP.name, 'animation.html')
+        a.save(path, 'html')
+        self.assertTrue(os.path.exists(path))
+    def test_animation_save_invalid_format(self):
+        self.assertRaises(KeyError, self.saved_animation().save, io.BytesIO(), 'png')
+    def test_animation_save_none_gzip(self):
+        self.assertRaises(TypeError, self.saved_animation().save, io.BytesIO(), gzip=None)
+    def test_animation_save_int_path(self):
+        self.assertRaises(TypeError, self.saved_animation().save, 0)
+    def test_animation_with_replaced_node(self):
+        a = fm.Animation()
+        g = self.empty_graph()
+        a.rec(g)
+        g.remove_node(0)
+        g.add_node('Other', pos=(0.5, 0.5))
+        a.rec(g)
+        file = io.BytesIO()
+        a.save(file)
+        figure = json.loads(file.getvalue())
+        self.assertEqual(len(figure['frames'][0]['data']), len(figure['frames'][1]['data']))
+        self.assertEqual(len(figure['frames'][0]['data']), 35)
+    def test_animation_workers(self):
+        files = []
+        for workers in [1, 2]:
+            a = fm.Animation(workers=workers)
+            g = self.partial_digraph()
+            a.rec(g)
+            g.remove_node(N)
+            a.rec(g)
+            files.append(io.BytesIO())
+            a.save(files[-1])
+            # the union graph is not kept alive by the module after the frames are built
+            self.assertEqual(fm.parallel._shared, ())
+        self.assertEqual(files[0].getvalue(), files[1].getvalue())
+    def test_animation_with_float_workers(self):
+        self.assertRaises(TypeError, fm.Animation, workers=1.5)
+    def test_animation_with_nonpositive_workers(self):
+        self.assertRaises(ValueError, fm.Animation, workers=0)
+    def test_animation_rec_without_pos(self):
+        a = fm.Animation()
+        self.assertRaises(KeyError, a.rec, nx.complete_graph(3))
+    def test_animation_report(self):
+        a = fm.Animation()
+        g = self.partial_graph()
+        a.rec(g)
+        g.nodes[N]['color'] = (255, 0, 0)
+        a.rec(g)
+        report = a.report()
+        self.assertEqual(report['frames'], 2)
+        self.assertLess(report['encoded'], report['full'])
+    def test_animation_cache(self):
+        fm.cache_clear()
+        a = self.saved_animation()
+        a.play()
+        a.play()
+        info = fm.cache_info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 1)
+
+
+    def scalar_scale(self, dx, dy, width, height, size):
+        d2 = (dx * width)**2 + (dy * height)**2
+        if d2 == 0:
+            return dx, dy
+        s = math.sqrt(size**2 / d2)
+        return s * dx, s * dy
+    def scalar_rotate(self, dx, dy, width, height, angle):
+        dx *= width
+        dy *= height
+        rx = dx * math.cos(angle) - dy * math.sin(angle)
+        ry = dx * math.sin(angle) + dy * math.cos(angle)
+        return rx / width, ry / height
+    def scalar_edge(self, x0, y0, x1, y1, directed, reciprocal, width, height, n_size, m_size, labflip, labdist, labfrac):
+        # the per-edge computation that preceded the vectorized kernel
+        width = 0.9 * width - 24
+        height = 0.9 * height - 24
+        ratio = width / height
+        dx = (y0 - y1) / ratio
+        dy = (x1 - x0) * ratio
+        if directed and reciprocal:
+            edge_space = max(0, min(fm.drawing.EDGE_SPACE, n_size - 2, m_size - 2))
+            sx, sy = self.scalar_scale(dx, dy, width, height, edge_space / 2)
+            x0 += sx
+            y0 += sy
+            x1 += sx
+            y1 += sy
+        X = [x0, x1, None]
+        Y = [y0, y1, None]
+        if labflip:
+            dx = -dx
+            dy = -dy
+        sx, sy = self.scalar_scale(dx, dy, width, height, labdist)
+        label = (x0 + labfrac * (x1 - x0) + sx, y0 + labfrac * (y1 - y0) + sy)
+        if directed:
+            dx = x0 - x1
+            dy = y0 - y1
+            radius = m_size / 2
+            sx, sy = self.scalar_scale(dx, dy, width, height, radius)
+            x0 = x1 + sx
+            y0 = y1 + sy
+            edge_size = max(1, min(fm.drawing.EDGE_SIZE, radius))
+            sx, sy = self.scalar_scale(dx, dy, width, height, edge_size)
+            angles = [-fm.drawing.EDGE_ANGLE] if reciprocal else [-fm.drawing.EDGE_ANGLE, fm.drawing.EDGE_ANGLE]
+            for angle in angles:
+                rx, ry = self.scalar_rotate(sx, sy, width, height, angle)
+                X.extend([x0, x0 + rx, None])
+                Y.extend([y0, y0 + ry, None])
+        return X, Y, label
+    def assertEdgeGeometry(self, directed, reciprocal):
+        # the second edge has zero length
+        coords = [(0.1, 0.2, 0.8, 0.6), (0.5, 0.5, 0.5, 0.5), (0.3, 0.9, 0.3, 0.1), (0.7, 0.4, 0.2, 0.4)]
+        keys = [(20, 30, 1, 'solid', (0, 0, 0), False, 10, 0.5), (20, 20, 1, 'solid', (0, 0, 0), True, 10, 0.5), (4, 2, 1, 'solid', (0, 0, 0), True, 0, 0.2), (40, 10, 1, 'solid', (0, 0, 0), False, 15, 1)]
+        edge_traces = [{'x': [], 'y': []} for _ in coords]
+        edge_label_trace = {'x': [], 'y': [], 'text': []}
+        fm.drawing._add_edges(coords, ['a', 'b', 'c', 'd'], keys, directed, [reciprocal] * len(coords), edge_traces, edge_label_trace, 800, 450)
+        for i, ((x0, y0, x1, y1), (n_size, m_size, _, _, _, labflip, labdist, labfrac)) in enumerate(zip(coords, keys)):
+            X, Y, (lx, ly) = self.scalar_edge(x0, y0, x1, y1, directed, reciprocal, 800, 450, n_size, m_size, labflip, labdist, labfrac)
+            for expected, actual in [(X, edge_traces[i]['x']), (Y, edge_traces[i]['y'])]:
+                self.assertEqual(len(actual), len(expected))
+                for e, a in zip(expected, actual):
+                    if e is None:
+                        self.assertIsNone(a)
+                    else:
+                        self.assertAlmostEqual(a, e, 12)
+            self.assertAlmostEqual(edge_label_trace['x'][i], lx, 12)
+            self.assertAlmostEqual(edge_label_trace['y'][i], ly, 12)
+        self.assertEqual(edge_label_trace['text'], ['a', 'b', 'c', 'd'])
+
+    def test_edge_geometry_straight(self):
+        self.assertEdgeGeometry(False, False)
+    def test_edge_geometry_directed(self):
+        self.assertEdgeGeometry(True, False)
+    def test_edge_geometry_reciprocal(self):
+        self.assertEdgeGeometry(True, True)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import subprocess
+import unittest
+
+
+ROOT = os.path.abspath(os.path.join('..'))
+
+HEAVY_MODULES = [
+    'plotly',
+    'pyvis',
+    'IPython',
+    'scipy.stats',
+    'statsmodels',
+    'prince',
+    'matplotlib',
+    'seaborn',
+]
+
+# wall-clock budget, in seconds, only checked when set, since a loaded machine can exceed any fixed value
+IMPORT_BUDGET = os.environ.get('FREEMAN_IMPORT_BUDGET')
+
+
+class ImportingTest(unittest.TestCase):
+    def run_python(self, *args):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([ROOT, env.get('PYTHONPATH', '')])
+        return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+    def test_import_without_heavy_modules(self):
+        code = 'import sys, freeman; print(" ".join(m for m in {} if m in sys.modules))'.format(HEAVY_MODULES)
+        self.assertEqual(self.run_python('-c', code).stdout.strip(), '')
+    def test_import_render_without_heavy_modules(self):
+        code = 'import sys, freeman.render; print(" ".join(m for m in {} if m in sys.modules))'.format(HEAVY_MODULES)
+        self.assertEqual(self.run_python('-c', code).stdout.strip(), '')
+    @unittest.skipUnless(IMPORT_BUDGET, 'set FREEMAN_IMPORT_BUDGET to check the import time')
+    def test_import_time(self):
+        times = []
+        for _ in range(3):
+            stderr = self.run_python('-X', 'importtime', '-c', 'import freeman').stderr
+            for line in stderr.splitlines():
+                _, cumulative, name = line.split('|')
+                if name.strip() == 'freeman':
+                    times.append(int(cumulative) / 1e6)
+        self.assertLess(min(times), float(IMPORT_BUDGET))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join('..')))
+
+import tempfile
+import unittest
+
+import networkx as nx
+import freeman as fm
+
+
+class LoadingTest(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.dir = temp.name
+
+    def gml(self, text):
+        path = os.path.join(self.dir, 'load.gml')
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+    def test_load(self):
+        g = fm.load(self.gml('''graph [
+  width 300
+  node_color "rgb(1, 2, 3)"
+  edge_labflip 1
+  node [ id 0 x 1.5 y 2 label "a&amp;b" ]
+  node [ id 1 color "rgba(4, 5, 6, 0.5)" tags "_networkx_list_start" tags 7 ]
+  edge [ source 0 target 1 labflip 0 ]
+]'''))
+        self.assertEqual(g.graph, {'width': 300})
+        self.assertEqual(g.nodes[0], {'label': 'a&b', 'color': (1, 2, 3), 'pos': (1.5, 2)})
+        self.assertEqual(g.nodes[1]['color'], (4, 5, 6, 0.5))
+        self.assertEqual(g.nodes[1]['tags'], [7])
+        self.assertIs(g.edges[0, 1]['labflip'], False)
+    def test_load_directed(self):
+        g = fm.load(self.gml('graph [ directed 1 edge [ source "b" target "a" ] node [ id "a" ] node [ id "b" ] ]'))
+        self.assertIsInstance(g, nx.DiGraph)
+        self.assertEqual(list(g.nodes), ['a', 'b'])
+        self.assertEqual(list(g.edges), [('b', 'a')])
+    def test_load_late_default(self):
+        g = fm.load(self.gml('graph [ node [ id 0 ] node [ id 1 size 5 ] node_size 10 ]'))
+        self.assertEqual(g.nodes[0]['size'], 10)
+        self.assertEqual(g.nodes[1]['size'], 5)
+    def test_load_duplicated_node(self):
+        self.assertRaises(nx.NetworkXError, fm.load, self.gml('graph [ node [ id 0 ] node [ id 0 ] ]'))
+    def test_load_invalid_labflip(self):
+        self.assertRaises(ValueError, fm.load, self.gml('graph [ node [ id 0 ] node [ id 1 ] edge [ source 0 target 1 labflip 2 ] ]'))
+
+
+if __name__ == '__main__':
+    unittest.main()
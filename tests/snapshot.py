@@ -0,0 +1,71 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join('..')))
+
+import tempfile
+import unittest
+
+import pandas as pd
+import networkx as nx
+import freeman as fm
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.dir = temp.name
+
+    def snapshot(self, g):
+        path = os.path.join(self.dir, 'load.snap')
+        g.save(path)
+        return fm.load_snapshot(path)
+    def test_load_snapshot(self):
+        g = fm.Graph(nx.path_graph(4))
+        g.graph['width'] = 300
+        g.nodes[0]['label'] = 'a&b'
+        g.nodes[1]['color'] = (4, 5, 6, 0.5)
+        g.nodes[2]['tags'] = [7]
+        g.set_all_nodes('size', 10)
+        g.set_each_edge('color', lambda n, m: (0, 0, 0, 0.5 if n else 0))
+        h = self.snapshot(g)
+        self.assertEqual(h.graph, {'width': 300})
+        self.assertEqual(list(h.nodes(data=True)), list(g.nodes(data=True)))
+        self.assertEqual(list(h.edges(data=True)), list(g.edges(data=True)))
+        self.assertIsInstance(h.edges[0, 1]['color'][3], int)
+        self.assertIsInstance(h.edges[1, 2]['color'][3], float)
+    def test_load_snapshot_directed(self):
+        g = fm.Graph(nx.MultiDiGraph([('b', 'a'), ('b', 'a'), ('a', 'c')]))
+        h = self.snapshot(g)
+        self.assertIsInstance(h, nx.MultiDiGraph)
+        self.assertEqual(list(h.nodes), ['b', 'a', 'c'])
+        self.assertEqual(list(h.edges(keys=True)), [('b', 'a', 0), ('b', 'a', 1), ('a', 'c', 0)])
+    def test_load_snapshot_frames(self):
+        g = fm.Graph(nx.grid_2d_graph(2, 2))
+        g.set_nodedata('degree', dict(g.degree))
+        g.nodeframe['name'] = ['a', 'b', 'c', 'd']
+        g.set_edgedata('weight', lambda n, m: 0.5)
+        h = self.snapshot(g)
+        pd.testing.assert_frame_equal(h.nodeframe, g.nodeframe)
+        pd.testing.assert_frame_equal(h.edgeframe, g.edgeframe)
+    def test_load_snapshot_edit_frames(self):
+        g = fm.Graph(nx.path_graph(4))
+        g.nodeframe['d'] = [1.0, 2.0, 3.0, 4.0]
+        g.set_edgedata('w', lambda n, m: 0.5)
+        path = os.path.join(self.dir, 'load.snap')
+        g.save(path)
+        h = fm.load_snapshot(path)
+        h.nodeframe.loc[0, 'd'] = 9.0
+        h.edgeframe.loc[(0, 1), 'w'] = 9.0
+        self.assertEqual(list(h.nodeframe['d']), [9.0, 2.0, 3.0, 4.0])
+        self.assertEqual(list(h.edgeframe['w']), [9.0, 0.5, 0.5])
+        pd.testing.assert_frame_equal(fm.load_snapshot(path).nodeframe, g.nodeframe)
+    def test_load_snapshot_invalid(self):
+        path = os.path.join(self.dir, 'load.gml')
+        with open(path, 'w') as file:
+            file.write('graph [ ]')
+        self.assertRaises(ValueError, fm.load_snapshot, path)
+
+
+if __name__ == '__main__':
+    unittest.main()